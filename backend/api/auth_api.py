@@ -1,31 +1,50 @@
-from flask import Blueprint, jsonify, request
-import sqlite3
-import bcrypt
+from flask import Blueprint, jsonify, request, g
+import jwt
 from functools import wraps
 
-from constants.config import DATABASE_PATH
+from db import get_db
 from constants.api_routes import AUTH_AR
-from constants.methods import POST_M
+from constants.methods import POST_M, GET_M
+from services.token_service import issue_token, decode_token, revoke_token
+from services.password_service import verify_password, needs_rehash, rehash_in_background, password_hasher, PasswordPoolBusy
+from models.user_model import Role
+
+# Role claims allowed on the admin-only and review endpoints. users and the token's role claim
+# hold the member name (users_api stores role.name), e.g. 'MANAGER' rather than 'PROJECT_MANAGER'
+ADMIN_ONLY = (Role.ADMIN.name,)
+REVIEWERS = (Role.ADMIN.name, Role.MANAGER.name)
 
 # Define a Blueprint for authentication
 auth_bp = Blueprint('auth', __name__)
 
-# Helper function to get a database connection
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
 # Decorator to require a token for authentication
-def token_required(f):
+def token_required(f=None, roles=None):
+    """
+    Require a valid login token as `Authorization: Bearer <token>`. The token is checked locally
+    (signature, expiry, revocation list), so no database access is needed beyond the revocation
+    list's periodic poll; its claims are put in g.user.
+    With roles, e.g. @token_required(roles=ADMIN_ONLY), the token's role claim must be one of them or the answer is 403.
+    """
+    if f is None:
+        return lambda view: token_required(view, roles=roles)
+
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Implement token checking logic here
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return jsonify({"error": "Authentication token is missing"}), 401
+        try:
+            g.user = decode_token(token)
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "Authentication token has expired"}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "Authentication token is invalid"}), 401
+        if roles is not None and g.user.get('role') not in roles:
+            return jsonify({"error": "You are not allowed to do this"}), 403
         return f(*args, **kwargs)
     return decorated_function
 
 @auth_bp.route(f'{AUTH_AR}/login', methods=[POST_M])
-@token_required
 def login():
     try:
         data = request.json
@@ -35,28 +54,48 @@ def login():
         if not username or not password:
             return jsonify({"error": "Username and password are required"}), 400
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Retrieve user based on EID
         cursor.execute('SELECT eid, password, role FROM users WHERE eid = ?', (username,))
         user = cursor.fetchone()
 
-        conn.close()
-
         if user:
             hashed_password = user['password']
-            if bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8')):
+            if verify_password(password, hashed_password):
+                # Move the stored hash to the configured work factor while we know the password
+                if needs_rehash(hashed_password):
+                    rehash_in_background(user['eid'], password, hashed_password)
+
+                token, claims = issue_token(user['eid'], user['role'])
                 return jsonify({
                     "message": "Login successful",
                     "eid": user['eid'],
-                    "role": user['role']
+                    "role": user['role'],
+                    "token": token,
+                    "expires_at": claims['exp'].isoformat()
                 }), 200
             else:
                 return jsonify({"error": "Invalid username or password"}), 401
         else:
             return jsonify({"error": "Invalid username or password"}), 401
 
+    except PasswordPoolBusy:
+        return jsonify({"error": "Too many logins in progress, please try again"}), 503, {'Retry-After': '1'}
+
     except Exception as e:
         print("Error:", e)
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route(f'{AUTH_AR}/stats', methods=[GET_M])
+def get_auth_stats():
+    """Queue wait, backlog and rejections of this worker's password hashing pool."""
+    return jsonify(password_hasher.stats()), 200
+
+@auth_bp.route(f'{AUTH_AR}/logout', methods=[POST_M])
+@token_required
+def logout():
+    # The token stays signed until it expires, so remember that it was given up
+    revoke_token(get_db(), g.user)
+    return jsonify({"message": "Logged out"}), 200
@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from constants.api_routes import CACHE_AR
+from constants.methods import GET_M, DELETE_M
+from services.response_cache import response_cache
+from api.auth_api import token_required, ADMIN_ONLY
+
+# Define a Blueprint for inspecting the in-process response cache
+cache_bp = Blueprint('cache', __name__)
+
+@cache_bp.route(f'{CACHE_AR}/stats', methods=[GET_M])
+def get_cache_stats():
+    """Report hits, misses, evictions and invalidations of this worker's response cache."""
+    return jsonify(response_cache.stats()), 200
+
+@cache_bp.route(CACHE_AR, methods=[DELETE_M])
+@token_required(roles=ADMIN_ONLY)
+def clear_cache():
+    response_cache.clear()
+    return jsonify({'message': 'Response cache cleared'}), 200
@@ -1,55 +1,59 @@
-from flask import jsonify, Blueprint, request
+from flask import jsonify, Blueprint, request, Response, stream_with_context
+from datetime import datetime
 import sqlite3
-from constants.config import DATABASE_PATH
+from db import get_db, pool
 from constants.api_routes import EMPLOYEES_AR
 from constants.methods import GET_M, POST_M, DELETE_M, PUT_M, PATCH_M
 import pandas as pd
 
-employees_bp = Blueprint('employees', __name__)
+from services.certifications_service import fetch_certifications_page, fetch_certification_filter_options, aggregate_certifications, iter_certifications_export
+from services.certifications_service import DEFAULT_PAGE_SIZE, EXPORT_FORMATS, CERTIFICATIONS_TABLES, CERTIFICATION_FIELDS, MAX_BATCH_SIZE
+from services.certifications_service import apply_certification_batch
+from services.conditional_service import conditional
+from services.response_cache import cached, invalidates
+from services.arrow_service import wants_arrow, rows_to_table, arrow_response
+from api.auth_api import token_required, ADMIN_ONLY
 
-# Helper function to get a database connection
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This allows us to get dictionary-like rows
-    return conn
+employees_bp = Blueprint('employees', __name__)
 
 @employees_bp.route(f"{EMPLOYEES_AR}/certifications", methods=[GET_M])
+@conditional('employees_certs')
+@cached('employees_certs')
 def get_cert_employees():
     """Fetch all employees."""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Execute the SQL query
         cursor.execute("SELECT * FROM employees_certs")
         rows = cursor.fetchall()
 
-        # Convert the rows to a list of dictionaries
-        employees = [dict(row) for row in rows]
-
-        conn.close()
-
-        return jsonify({"employees": employees}), 200
+        # The JSON provider encodes the rows as objects directly
+        return jsonify({"employees": rows}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
 @employees_bp.route(f"{EMPLOYEES_AR}/certificates", methods=[GET_M])
+@conditional('certifications')
+@cached('certifications')
 def get_certificates():
     """Fetch all certificates."""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Execute the SQL query
         cursor.execute("SELECT * FROM certifications")
         rows = cursor.fetchall()
 
-        # Convert the rows to a list of dictionaries
         columns = [desc[0] for desc in cursor.description]
-        certificates = [dict(zip(columns, row)) for row in rows]
+        if wants_arrow(request):
+            return arrow_response(rows_to_table(columns, rows))
 
-        conn.close()
+        # Convert the rows to a list of dictionaries
+        certificates = [dict(zip(columns, row)) for row in rows]
 
         return jsonify({"certificates": certificates}), 200
 
@@ -58,10 +62,12 @@ def get_certificates():
 
 
 @employees_bp.route(EMPLOYEES_AR, methods=[GET_M])
+@conditional('employees_certs')
+@cached('employees_certs')
 def get_employees():
     """Fetch all employees with distinct EIDs and selected columns."""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Execute the SQL query with DISTINCT on EID and select only the desired columns
@@ -82,6 +88,9 @@ def get_employees():
         
         rows = cursor.fetchall()
 
+        if wants_arrow(request):
+            return arrow_response(rows_to_table([desc[0] for desc in cursor.description], rows))
+
         # Convert the rows to a list of dictionaries
         employees = [
             {
@@ -98,8 +107,6 @@ def get_employees():
             for row in rows
         ]
 
-        conn.close()
-
         return jsonify({"employees": employees}), 200
 
     except Exception as e:
@@ -107,21 +114,19 @@ def get_employees():
 
     
 @employees_bp.route(f"{EMPLOYEES_AR}/<EID>", methods=[GET_M])
+@conditional('employees_certs')
 def get_employee_by_id(EID):
     """Fetch an employee by their ID."""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Execute the SQL query to get the employee by ID
         cursor.execute("SELECT * FROM employees_certs WHERE EID = ?", (EID,))
         row = cursor.fetchone()
 
-        conn.close()
-
         if row:
-            employee = dict(row)
-            return jsonify({"employee": employee}), 200
+            return jsonify({"employee": row}), 200
         else:
             return jsonify({"message": "Employee not found"}), 404
 
@@ -130,11 +135,12 @@ def get_employee_by_id(EID):
 
     
 @employees_bp.route(EMPLOYEES_AR, methods=[POST_M])
+@invalidates('employees_certs')
 def add_employee():
     """Add a new employee."""
     try:
         new_employee = request.json
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         print(new_employee)
 
@@ -148,7 +154,6 @@ def add_employee():
               new_employee['RETAKE_EXAM_DATE'], new_employee['EXPIRATION_DATE'], new_employee['PROJECT_NAME']))
 
         conn.commit()
-        conn.close()
 
         return jsonify({"message": "Employee added successfully"}), 201
 
@@ -160,11 +165,12 @@ def add_employee():
 
 
 @employees_bp.route(f"{EMPLOYEES_AR}/<employee_id>", methods=[PUT_M])
+@invalidates('employees_certs')
 def update_employee(employee_id):
     """Update an existing employee."""
     try:
         updated_employee = request.json
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Update employee record
@@ -179,7 +185,6 @@ def update_employee(employee_id):
               employee_id))
 
         conn.commit()
-        conn.close()
 
         return jsonify({"message": "Employee updated successfully"}), 200
 
@@ -187,9 +192,10 @@ def update_employee(employee_id):
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route(f"{EMPLOYEES_AR}/<employee_id>", methods=[PATCH_M])
+@invalidates('employees_certs')
 def modify_employee(employee_id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Get the JSON data from the request
@@ -207,25 +213,23 @@ def modify_employee(employee_id):
         if cursor.rowcount == 0:
             return jsonify({'message': 'Employee not found'}), 404
 
-        conn.close()
-
         return jsonify({'message': 'Employee updated successfully'}), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 50
 
 @employees_bp.route(f"{EMPLOYEES_AR}/<employee_id>", methods=[DELETE_M])
+@invalidates('employees_certs')
 def delete_employee(employee_id):
     """Delete an employee."""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         # Delete employee record
         cursor.execute("DELETE FROM employees_certs WHERE id = ?", (employee_id,))
 
         conn.commit()
-        conn.close()
 
         return jsonify({"message": "Employee deleted successfully"}), 200
 
@@ -233,9 +237,11 @@ def delete_employee(employee_id):
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route(f'{EMPLOYEES_AR}/get_certifications', methods=[GET_M])
+@conditional(*CERTIFICATIONS_TABLES)
+@cached(*CERTIFICATIONS_TABLES)
 def get_certifications():
     try:
-        con = get_db_connection()
+        con = get_db()
         if isinstance(con, tuple):  # This checks if get_db_connection returned an error tuple
             return con
 
@@ -251,8 +257,16 @@ def get_certifications():
         ON 
             ec.TARGET_CERTIFICATION = ce.Certification_Name
         """
+
+        # Arrow clients get the rows column by column without the pandas/JSON round trip
+        if wants_arrow(request):
+            cursor = con.execute(query)
+            rows = cursor.fetchall()
+            if not rows:
+                return jsonify({'message': 'No data found in the database.'}), 404
+            return arrow_response(rows_to_table([desc[0] for desc in cursor.description], rows))
+
         df = pd.read_sql_query(query, con)
-        con.close()
         
         if df.empty:
             return jsonify({'message': 'No data found in the database.'}), 404
@@ -264,8 +278,78 @@ def get_certifications():
     except Exception as e:
         return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
 
+@employees_bp.route(f'{EMPLOYEES_AR}/certifications/page', methods=[GET_M])
+@conditional(*CERTIFICATIONS_TABLES)
+def get_certifications_page():
+    """Fetch one filtered page of certifications. Paginate by passing the returned next_cursor as `after`."""
+    try:
+        after = request.args.get('after')
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+
+        page = fetch_certifications_page(get_db(), request.args, after=after, limit=limit)
+        return jsonify(page), 200
+
+    except ValueError:
+        return jsonify({'error': 'Invalid pagination cursor'}), 400
+    except sqlite3.Error as e:
+        return jsonify({'error': f'Database query failed: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
+
+@employees_bp.route(f'{EMPLOYEES_AR}/certifications/aggregate', methods=[GET_M])
+@conditional(*CERTIFICATIONS_TABLES)
+def get_certification_counts():
+    """Fetch grouped certification counts for one or more `dimension` parameters under the same filters as the listing."""
+    dimensions = request.args.getlist('dimension')
+    if not dimensions:
+        return jsonify({'error': 'At least one dimension is required'}), 400
+
+    try:
+        counts, data_version = aggregate_certifications(get_db(), dimensions, request.args)
+        return jsonify({'counts': counts, 'data_version': data_version}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except sqlite3.Error as e:
+        return jsonify({'error': f'Database query failed: {str(e)}'}), 500
+
+@employees_bp.route(f'{EMPLOYEES_AR}/certifications/export', methods=[GET_M])
+def export_certifications():
+    """Stream every certification matching the listing filters as CSV (default) or NDJSON (`format=ndjson`)."""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+
+    args = request.args.copy()
+
+    def generate():
+        # The stream outlives the view function, so it holds its own pooled connection
+        conn = pool.acquire()
+        try:
+            yield from iter_certifications_export(conn, args, export_format)
+        finally:
+            pool.release(conn)
+
+    filename = f"certifications_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+@employees_bp.route(f'{EMPLOYEES_AR}/certifications/filter_options', methods=[GET_M])
+@conditional(*CERTIFICATIONS_TABLES)
+def get_certification_filter_options():
+    """Fetch the distinct values available for each certification filter."""
+    try:
+        return jsonify({'options': fetch_certification_filter_options(get_db())}), 200
+
+    except sqlite3.Error as e:
+        return jsonify({'error': f'Database query failed: {str(e)}'}), 500
+
 
 @employees_bp.route(f'{EMPLOYEES_AR}/update_progress', methods=[POST_M])
+@invalidates('employees_certs')
 def update_progress():
     try:
         data = request.json
@@ -275,7 +359,7 @@ def update_progress():
         if not eid or not certification:
             return jsonify({'error': 'Missing eid or certification'}), 400
 
-        con = get_db_connection()
+        con = get_db()
         if isinstance(con, tuple):  # This checks if connect_db returned an error tuple
             return con
 
@@ -292,7 +376,6 @@ def update_progress():
         if cursor.rowcount == 0:
             return jsonify({'error': 'No records updated. Please check EID and Certification.'}), 404
         
-        con.close()
         return jsonify({'message': f'Database updated for EID: {eid} with Certification: {certification}'})
 
     except sqlite3.Error as e:
@@ -302,6 +385,7 @@ def update_progress():
     
 # Route to add a new certificate
 @employees_bp.route(f'{EMPLOYEES_AR}/certification', methods=[POST_M])
+@invalidates('employees_certs')
 def add_certification():
     try:
         data = request.json
@@ -334,7 +418,7 @@ def add_certification():
         if retake_exam_date == 'None':
             retake_exam_date = None
 
-        with get_db_connection() as conn:
+        with get_db() as conn:
             conn.execute('''
                 INSERT INTO employees_certs (
                     FIRST_NAME, LAST_NAME, EID, EMPLOYEE_ID, MANAGEMENT_LEVEL, CAPABILITY, PROJECT_NAME,
@@ -348,8 +432,9 @@ def add_certification():
             ))
             conn.commit()
 
-        
         return jsonify({"message": "Certificate added successfully."}), 201
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": f"Failed to add certificate: {str(e)}"}), 409
     except Exception as e:
         return jsonify({"error": f"Failed to add certificate: {str(e)}"}), 500
 
@@ -357,7 +442,7 @@ def add_certification():
 @employees_bp.route(f'{EMPLOYEES_AR}/certificates/<string:eid>', methods=[GET_M])
 def get_certificate_by_eid(eid):
     try:
-        with employees_bp() as conn:
+        with get_db() as conn:
             cur = conn.execute('SELECT * FROM certificates WHERE EID = ?', (eid,))
             row = cur.fetchone()
             if row:
@@ -372,7 +457,7 @@ def get_certificate_by_eid(eid):
 def update_certificate(eid):
     try:
         data = request.json
-        with get_db_connection() as conn:
+        with get_db() as conn:
             conn.execute('''
                 UPDATE certificates SET 
                     FIRST_NAME = ?, LAST_NAME = ?, MANAGEMENT_LEVEL = ?, CAPABILITY = ?, 
@@ -396,6 +481,7 @@ def update_certificate(eid):
         return jsonify({"error": f"Failed to update certificate: {str(e)}"}), 500
 
 @employees_bp.route('/update_certification/<int:cert_id>', methods=['PATCH'])
+@invalidates('employees_certs')
 def update_certification(cert_id):
     data = request.get_json()
     
@@ -403,14 +489,7 @@ def update_certification(cert_id):
         return jsonify({'error': 'No data provided'}), 400
 
     # Validate and sanitize input data
-    fields = [
-        'FIRST_NAME', 'LAST_NAME', 'EID', 'EMPLOYEE_ID', 'MANAGER_EID', 'MANAGEMENT_LEVEL',
-        'CAPABILITY', 'EMPLOYEE_STATUS', 'WITH_VOUCHER', 'CURRENT_PROGRESS',
-        'TARGET_CERTIFICATION', '1ST_TARGET_CERTIFICATION_DATE', 'RETAKE_EXAM_DATE',
-        'EXPIRATION_DATE', 'FISCAL_YEAR', 'QUARTER', 'MONTH', 'PROJECT_NAME'
-    ]
-    
-    updates = {field: value for field, value in data.items() if field in fields}
+    updates = {field: value for field, value in data.items() if field in CERTIFICATION_FIELDS}
     
     if not updates:
         return jsonify({'error': 'No valid fields to update'}), 400
@@ -422,31 +501,55 @@ def update_certification(cert_id):
     values = list(updates.values()) + [cert_id]
     
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
-        conn.close()
         return jsonify({'message': 'Certificate updated successfully'}), 200
     except sqlite3.Error as e:
         return jsonify({'error': str(e)}), 500
 
+@employees_bp.route(f'{EMPLOYEES_AR}/certifications/batch', methods=[POST_M])
+@token_required(roles=ADMIN_ONLY)
+@invalidates('employees_certs')
+def batch_certifications():
+    """
+    Apply many certification inserts, patches and deletes in one transaction:
+    {"operations": [{"op": "patch", "id": 12, "fields": {...}}, ...], "atomic": false}
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'A non-empty list of operations is required'}), 400
+    if len(operations) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} operations per batch'}), 400
+
+    atomic = bool(data.get('atomic', False))
+    try:
+        results, applied = apply_certification_batch(get_db(), operations, atomic=atomic)
+    except sqlite3.Error as e:
+        return jsonify({'error': f'Batch failed and was rolled back: {str(e)}'}), 500
+
+    failed = len(results) - applied
+    status = 409 if atomic and failed else 200
+    return jsonify({'results': results, 'applied': applied, 'failed': failed}), status
+
 @employees_bp.route('/delete_certification/<int:cert_id>', methods=['DELETE'])
+@invalidates('employees_certs')
 def delete_certification(cert_id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         
         # Check if the certification exists
         cursor.execute("SELECT * FROM employees_certs WHERE employees_cert_id = ?", (cert_id,))
         if cursor.fetchone() is None:
-            conn.close()
             return jsonify({'error': 'Certification not found'}), 404
         
         # Perform the deletion
         cursor.execute("DELETE FROM employees_certs WHERE employees_cert_id = ?", (cert_id,))
         conn.commit()
-        conn.close()
         return jsonify({'message': 'Certification deleted successfully'}), 200
     except sqlite3.Error as e:
         return jsonify({'error': str(e)}), 500
@@ -1,8 +1,11 @@
 from flask import Flask, request, jsonify, Blueprint
-import sqlite3
 from sqlite3 import Error
+from datetime import datetime
 
-from constants.config import DATABASE_PATH
+from db import get_db
+from db.event_times import event_timestamp, fill_event_times, EVENT_TIMESTAMP_FORMAT
+from services.conditional_service import conditional
+from services.response_cache import cached, invalidates
 from constants.methods import GET_M, POST_M, PUT_M, DELETE_M
 from constants.api_routes import EVENTS_AR
 
@@ -10,14 +13,13 @@ events_bp = Blueprint('events', __name__)
 
 def get_db_connection():
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_db()
     except Error as e:
         print(f"Database connection error: {e}")
         return None
 
 @events_bp.route(EVENTS_AR, methods=[POST_M])
+@invalidates('events')
 def create_event():
     data = request.json
     event_name = data.get('event_name')
@@ -39,37 +41,56 @@ def create_event():
     try:
         cursor = conn.cursor()
         cursor.execute('''
-        INSERT INTO events (event_name, start_date, start_time, end_date, end_time, description, color)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (event_name, start_date, start_time, end_date, end_time, description, color))
+        INSERT INTO events (event_name, start_date, start_time, end_date, end_time, description, color, start_at, end_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (event_name, start_date, start_time, end_date, end_time, description, color,
+              event_timestamp(start_date, start_time), event_timestamp(end_date, end_time)))
         conn.commit()
     except Error as e:
         conn.rollback()
         return jsonify({"status": "error", "message": f"Failed to create event: {e}"}), 500
-    finally:
-        conn.close()
 
     return jsonify({"status": "success", "message": "Event created successfully"}), 201
 
+def _window_bound(value):
+    """Normalize a window bound to the start_at / end_at format; a timezone offset is ignored."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).strftime(EVENT_TIMESTAMP_FORMAT)
+
 @events_bp.route(EVENTS_AR, methods=[GET_M])
+@conditional('events')
+@cached('events')
 def get_events():
+    # Optional ISO date or datetime window, e.g. ?start=2024-08-01&end=2024-09-01 (end exclusive)
+    try:
+        start, end = (_window_bound(request.args.get(name)) for name in ('start', 'end'))
+    except ValueError:
+        return jsonify({"status": "error", "message": "start and end must be ISO dates, e.g. 2024-08-01."}), 400
+
     conn = get_db_connection()
     if conn is None:
         return jsonify({"status": "error", "message": "Database connection failed."}), 500
 
     try:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM events')
-        rows = cursor.fetchall()
-        events = [dict(row) for row in rows]
+        if start is None and end is None:
+            cursor.execute('SELECT * FROM events')
+        else:
+            # Every event that overlaps the window, including ones that started before it
+            cursor.execute('''
+            SELECT * FROM events
+            WHERE start_at < ? AND end_at >= ?
+            ORDER BY start_at
+            ''', (end or '9999', start or ''))
+        events = cursor.fetchall()
     except Error as e:
         return jsonify({"status": "error", "message": f"Failed to retrieve events: {e}"}), 500
-    finally:
-        conn.close()
 
     return jsonify(events), 200
 
 @events_bp.route(f'{EVENTS_AR}/<int:event_id>', methods=[PUT_M])
+@invalidates('events')
 def update_event(event_id):
     data = request.json
     event_name = data.get('event_name')
@@ -97,16 +118,17 @@ def update_event(event_id):
         ''', (event_name, start_date, start_time, end_date, end_time, color, event_id))
         if cursor.rowcount == 0:
             return jsonify({"status": "error", "message": "Event not found."}), 404
+        # Only some of the date and time columns may have changed, so recompute from the stored row
+        fill_event_times(conn, event_ids=[event_id])
         conn.commit()
     except Error as e:
         conn.rollback()
         return jsonify({"status": "error", "message": f"Failed to update event: {e}"}), 500
-    finally:
-        conn.close()
 
     return jsonify({"status": "success", "message": "Event updated successfully"}), 200
 
 @events_bp.route(f'{EVENTS_AR}/<int:event_id>', methods=[DELETE_M])
+@invalidates('events')
 def delete_event(event_id):
     conn = get_db_connection()
     if conn is None:
@@ -121,7 +143,5 @@ def delete_event(event_id):
     except Error as e:
         conn.rollback()
         return jsonify({"status": "error", "message": f"Failed to delete event: {e}"}), 500
-    finally:
-        conn.close()
 
     return jsonify({"status": "success", "message": "Event deleted successfully"}), 200
@@ -1,14 +1,18 @@
+import sqlite3
 from flask import jsonify, Blueprint, request
 
 from constants.api_routes import INGEST_AR
 from constants.methods import POST_M
 
-from services.ingest_data_service import create_table_from_csv, add_rows_to_table
+from services.ingest_data_service import create_table_from_csv, add_rows_to_table, merge_rows_into_table, rollback_table
+from services.response_cache import response_cache
+from api.auth_api import token_required, ADMIN_ONLY
 # from db.schema import delete_events_table
 
 ingest_data_bp = Blueprint('ingest_data', __name__)
 
 @ingest_data_bp.route(f'{INGEST_AR}/upload_csv', methods=[POST_M])
+@token_required(roles=ADMIN_ONLY)
 def upload_csv():
     # delete_events_table()
     
@@ -20,15 +24,47 @@ def upload_csv():
     if not table_name or not file or not operation:
         return jsonify({"error": "Table name, operation, and CSV file are required"}), 400
     
-    # Read CSV data as a string
-    csv_data = file.read().decode('utf-8')
+    # Parse straight from the upload stream (spooled to disk by werkzeug when large), chunk by chunk
+    try:
+        if operation == "Create New Table":
+            stats = create_table_from_csv(file.stream, table_name)
+        elif operation == "Add Rows to Existing Table":
+            stats = add_rows_to_table(file.stream, table_name)
+        elif operation == "Merge":
+            # Optional comma-separated natural key, e.g. "EID,TARGET_CERTIFICATION"
+            key_columns = [column.strip() for column in request.form.get('key_columns', '').split(',') if column.strip()]
+            stats = merge_rows_into_table(file.stream, table_name, key_columns)
+        else:
+            return jsonify({"error": "Invalid operation"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except sqlite3.IntegrityError as e:
+        # e.g. a UNIQUE index the table carries; the load was rolled back as a whole
+        return jsonify({"error": f"The CSV conflicts with rows already in '{table_name}': {e}"}), 409
     
-    # Perform the requested operation
-    if operation == "Create New Table":
-        create_table_from_csv(csv_data, table_name)
-    elif operation == "Add Rows to Existing Table":
-        add_rows_to_table(csv_data, table_name)
-    else:
-        return jsonify({"error": "Invalid operation"}), 400
-    
-    return jsonify({"message": f"Operation '{operation}' on table '{table_name}' completed successfully"}), 200
+    response_cache.invalidate([table_name])
+
+    message = (f"Operation '{operation}' on table '{table_name}' completed successfully: "
+               f"{stats['rows']} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+    if 'changed' in stats:
+        message += f", {stats['changed']} changed, {stats['unchanged']} unchanged"
+
+    return jsonify({"message": message, "stats": stats}), 200
+
+
+@ingest_data_bp.route(f'{INGEST_AR}/rollback', methods=[POST_M])
+@token_required(roles=ADMIN_ONLY)
+def rollback():
+    """Swap the generation replaced by the last "Create New Table" back in."""
+    table_name = (request.get_json(silent=True) or {}).get('table_name') or request.form.get('table_name')
+    if not table_name:
+        return jsonify({"error": "Table name is required"}), 400
+
+    try:
+        rollback_table(table_name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+    response_cache.invalidate([table_name])
+
+    return jsonify({"message": f"Table '{table_name}' rolled back to its previous generation"}), 200
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+from flask import Blueprint, jsonify, request, send_file, g
+
+from db import get_db
+from constants.api_routes import JOBS_AR
+from constants.methods import GET_M, POST_M
+from services.certifications_service import EXPORT_FORMATS
+from services.job_service import job_runner, get_job, list_jobs, new_job_id, job_file_path, SUCCEEDED
+from api.auth_api import token_required, ADMIN_ONLY
+
+# Define a Blueprint for background jobs
+jobs_bp = Blueprint('jobs', __name__)
+
+# Job kinds that can be submitted as plain JSON; ingests go through /ingest with their file
+JSON_JOB_KINDS = ['certifications_export', 'analytics']
+# Kinds that write to the database: only admins submit or cancel them
+ADMIN_JOB_KINDS = ['ingest_csv', 'analytics']
+
+@jobs_bp.route(JOBS_AR, methods=[POST_M])
+@token_required
+def submit_job():
+    """Queue a job: {"kind": "...", "params": {...}}. Returns 202 with the job to poll."""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
+    if kind not in JSON_JOB_KINDS:
+        return jsonify({'error': f"Unsupported job kind: {kind}"}), 400
+    if kind in ADMIN_JOB_KINDS and g.user.get('role') not in ADMIN_ONLY:
+        return jsonify({'error': "You are not allowed to do this"}), 403
+
+    job_id = job_runner.submit(kind, data.get('params') or {})
+    return jsonify({'job': get_job(get_db(), job_id)}), 202
+
+@jobs_bp.route(f'{JOBS_AR}/ingest', methods=[POST_M])
+@token_required(roles=ADMIN_ONLY)
+def submit_ingest_job():
+    """Same form as /api/ingest/upload_csv, but the load runs in the background."""
+    table_name = request.form.get('table_name')
+    operation = request.form.get('operation')
+    file = request.files.get('file')
+
+    if not table_name or not file or not operation:
+        return jsonify({"error": "Table name, operation, and CSV file are required"}), 400
+
+    # The request stream is gone once we respond, so keep the upload until the job has read it
+    job_id = new_job_id()
+    file_path = job_file_path(job_id, '.csv')
+    file.save(file_path)
+
+    key_columns = [column.strip() for column in request.form.get('key_columns', '').split(',') if column.strip()]
+    job_runner.submit('ingest_csv', {
+        'file_path': file_path,
+        'table_name': table_name,
+        'operation': operation,
+        'key_columns': key_columns,
+    }, job_id=job_id)
+    return jsonify({'job': get_job(get_db(), job_id)}), 202
+
+@jobs_bp.route(JOBS_AR, methods=[GET_M])
+@token_required
+def get_jobs():
+    """Most recent jobs first."""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({'jobs': list_jobs(get_db(), max(1, min(limit, 500)))}), 200
+
+@jobs_bp.route(f'{JOBS_AR}/<job_id>', methods=[GET_M])
+@token_required
+def get_job_status(job_id):
+    job = get_job(get_db(), job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job': job}), 200
+
+@jobs_bp.route(f'{JOBS_AR}/<job_id>/cancel', methods=[POST_M])
+@token_required
+def cancel_job(job_id):
+    conn = get_db()
+    job = get_job(conn, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['kind'] in ADMIN_JOB_KINDS and g.user.get('role') not in ADMIN_ONLY:
+        return jsonify({'error': "You are not allowed to do this"}), 403
+    try:
+        job = job_runner.cancel(conn, job_id)
+    except sqlite3.OperationalError:
+        # The job runs in another worker and its load holds the write lock; the flag can be set once it lets go
+        return jsonify({'error': 'The job is busy writing to the database, please try again'}), 503, {'Retry-After': '2'}
+    return jsonify({'job': job}), 200
+
+@jobs_bp.route(f'{JOBS_AR}/<job_id>/result', methods=[GET_M])
+@token_required
+def download_job_result(job_id):
+    """Download the file a finished export job produced."""
+    job = get_job(get_db(), job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    result = job['result'] or {}
+    if job['status'] != SUCCEEDED or not result.get('path') or not os.path.exists(result['path']):
+        return jsonify({'error': 'This job has no result file'}), 404
+
+    return send_file(
+        result['path'],
+        mimetype=EXPORT_FORMATS.get(result.get('format'), 'application/octet-stream'),
+        as_attachment=True,
+        download_name=f"certifications_{job_id}.{result.get('format', 'csv')}",
+    )
@@ -1,13 +1,21 @@
 from flask import jsonify, Blueprint, request
-import sqlite3
 
-from constants.config import DATABASE_PATH
-from constants.methods import POST_M
+from db import get_db
+from constants.methods import POST_M, GET_M
 from constants.api_routes import LLM_AR
-from services.llm_service import generate_response, generate_sql_query
+from services.llm_service import generate_response, generate_sql_query, llm_runner, LLMBusy, LLMTimeout
+from services.sql_cache_service import sql_query_cache
 
 llm_query_bp = Blueprint('llm_query', __name__)
 
+@llm_query_bp.errorhandler(LLMBusy)
+def llm_busy(e):
+    return jsonify({"error": "CertiGuide is answering too many questions, please try again"}), 503, {'Retry-After': '5'}
+
+@llm_query_bp.errorhandler(LLMTimeout)
+def llm_timeout(e):
+    return jsonify({"error": "CertiGuide took too long to answer, please try again"}), 504
+
 #! Working QUESTIONS
 #* in there progress, how many employees are passed in Google related certificate
 #* give me a summarize version of our data
@@ -15,12 +23,6 @@ llm_query_bp = Blueprint('llm_query', __name__)
 #* is preston.lozano exists in the manager_eid column?
 #* Can you provide a breakdown of certification progress by employee ID?
 
-# Helper function to get a database connection
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This allows us to get dictionary-like rows
-    return conn
-
 def get_paginated_query(query, page=1, page_size=10):
     offset = (page - 1) * page_size
     return f"{query} LIMIT {page_size} OFFSET {offset}"
@@ -41,14 +43,22 @@ def suggested_questions():
     ]
     return jsonify({"suggested_questions": questions})
 
+@llm_query_bp.route(f'{LLM_AR}/stats', methods=[GET_M])
+def llm_stats():
+    return jsonify({**llm_runner.stats(), 'sql_cache': sql_query_cache.stats(get_db())}), 200
+
 
 @llm_query_bp.route(LLM_AR, methods=[POST_M])
 def llm_query():
     data = request.json
     question = data.get("question", "").lower()
 
-    # Generate SQL query using the AI model
-    sql_query = generate_sql_query(question)
+    # Generate SQL query using the AI model, unless this question was already answered for the current schema
+    conn = get_db()
+    sql_query = sql_query_cache.get(conn, question)
+    if sql_query is None:
+        sql_query = generate_sql_query(question)
+        sql_query_cache.put(conn, question, sql_query)
     
     print("Query:", sql_query)
     
@@ -60,12 +70,12 @@ def llm_query():
 
     # Execute the SQL query if it is valid
     try:
-        conn = get_db_connection()  # Define or import this function to get a database connection
         cursor = conn.cursor()
         cursor.execute(sql_query)
         db_data = cursor.fetchall()
-        conn.close()
     except Exception as e:
+        # Do not hand the same broken SQL to the next person asking
+        sql_query_cache.discard(conn, question)
         answer = generate_response(question, "There's no result found in our database or I can't interpret the data that you gave.")
         return jsonify({"answer": answer})
 
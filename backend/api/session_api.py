@@ -1,57 +1,35 @@
 from flask import Blueprint, jsonify, request
-import sqlite3
-from datetime import datetime, timedelta
-from constants.config import DATABASE_PATH
+from db import get_db
 from constants.api_routes import SESSION_AR
 from constants.methods import POST_M, GET_M, DELETE_M
-import uuid
+from services.session_store import session_store, is_expired
 
 # Define a Blueprint for session management
 session_bp = Blueprint('session', __name__)
 
-# Helper function to get a database connection
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+def _session_id():
+    # Sent as the X-Session-ID header, or as session_id in the query string or JSON body
+    data = request.get_json(silent=True) or {}
+    return request.headers.get('X-Session-ID') or request.args.get('session_id') or data.get('session_id')
 
 # Function to create or update the session
 @session_bp.route(f'{SESSION_AR}/create_or_update', methods=[POST_M])
 def create_or_update_session():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = get_db()
+        data = request.get_json(silent=True) or {}
 
-        # Check if a session already exists
-        cursor.execute('SELECT * FROM sessions LIMIT 1')
-        existing_session = cursor.fetchone()
+        # Extend the caller's own session when it is still live, otherwise start a new one
+        session_id = _session_id()
+        session = session_store.refresh(conn, session_id, data.get('eid'), data.get('role')) if session_id else None
+        if session is None:
+            session = session_store.create(conn, data.get('eid'), data.get('role'))
 
-        expiration_date = datetime.utcnow() + timedelta(hours=1)  # Session valid for 1 hour
-        last_accessed = datetime.utcnow()
-
-        print("EID:", request.json.get('eid'))
-        print("Expiration:", expiration_date)
-        print("Last accessed:", last_accessed)
-        print("Role:", request.json.get('role'))
-
-        if existing_session:
-            # Update the existing session
-            cursor.execute(
-                'UPDATE sessions SET expiration_date = ?, last_accessed = ?, role = ?, eid = ?, is_active = TRUE WHERE session_id = ?',
-                (expiration_date, last_accessed, request.json.get('role'), request.json.get('eid'), existing_session['session_id'])
-            )
-        else:
-            # Create a new session
-            session_id = str(uuid.uuid4())  # Generate a unique session ID
-            cursor.execute(
-                'INSERT INTO sessions (session_id, expiration_date, role, eid) VALUES (?, ?, ?, ?)',
-                (session_id, expiration_date, request.json.get('role'), request.json.get('eid'))
-            )
-
-        conn.commit()
-        conn.close()
-
-        return jsonify({"message": "Session created or updated successfully", "expiration_date": expiration_date.isoformat()}), 201
+        return jsonify({
+            "message": "Session created or updated successfully",
+            "session_id": session['session_id'],
+            "expiration_date": session['expiration_date'],
+        }), 201
 
     except Exception as e:
         print("Error:", e)
@@ -61,19 +39,13 @@ def create_or_update_session():
 @session_bp.route(f'{SESSION_AR}/fetch', methods=[GET_M])
 def fetch_session():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM sessions LIMIT 1')
-        session = cursor.fetchone()
-
-        conn.close()
+        session_id = _session_id()
+        session = session_store.get(get_db(), session_id) if session_id else None
 
         if session:
-            expiration_date = datetime.fromisoformat(session['expiration_date'])
-            if expiration_date < datetime.utcnow():
+            if is_expired(session):
                 return jsonify({"error": "Session has expired"}), 410  # Gone
-            return jsonify(dict(session)), 200
+            return jsonify(session), 200
         else:
             return jsonify({"error": "No active session found"}), 404
 
@@ -85,14 +57,9 @@ def fetch_session():
 @session_bp.route(f'{SESSION_AR}/delete', methods=[DELETE_M])
 def delete_session():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('DELETE FROM sessions WHERE is_active = TRUE LIMIT 1')
-        conn.commit()
+        session_id = _session_id()
 
-        if cursor.rowcount > 0:
-            conn.close()
+        if session_id and session_store.delete(get_db(), session_id):
             return jsonify({"message": "Session deleted successfully"}), 200
         else:
             return jsonify({"error": "No active session found"}), 404
@@ -101,19 +68,11 @@ def delete_session():
         print("Error:", e)
         return jsonify({'error': str(e)}), 500
 
-# Function to delete expired sessions
+# Function to delete expired sessions. The session sweeper does this periodically; this runs it now.
 @session_bp.route(f'{SESSION_AR}/cleanup', methods=[POST_M])
 def cleanup_sessions():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Delete sessions where the expiration date is in the past
-        cursor.execute('DELETE FROM sessions WHERE expiration_date < ? AND is_active = TRUE', (datetime.utcnow(),))
-        conn.commit()
-
-        rows_deleted = cursor.rowcount
-        conn.close()
+        rows_deleted = session_store.sweep(get_db())
 
         return jsonify({"message": f"{rows_deleted} expired sessions deleted"}), 200
 
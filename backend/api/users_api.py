@@ -1,25 +1,25 @@
 from flask import Blueprint, jsonify, request, abort
-import sqlite3
-import bcrypt
 from models.user_model import Role, User
 from constants.api_routes import USERS_AR
 from constants.methods import GET_M, POST_M, PUT_M, DELETE_M
-from constants.config import DATABASE_PATH
+from db import get_db
+from services.conditional_service import conditional
+from services.response_cache import cached, invalidates
+from services.certifications_service import review_certifications, REVIEW_DECISIONS, MAX_BATCH_SIZE
+from api.auth_api import token_required, REVIEWERS
+from services.password_service import hash_password, PasswordPoolBusy
 
 # Define a Blueprint for the user API
 users_bp = Blueprint('users', __name__)
 
-# Helper function to get a database connection
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+@users_bp.errorhandler(PasswordPoolBusy)
+def password_pool_busy(e):
+    return jsonify({"error": "Too many password changes in progress, please try again"}), 503, {'Retry-After': '1'}
 
 # Helper function to find a user by eid
 def find_user(eid):
-    conn = get_db_connection()
+    conn = get_db()
     user_data = conn.execute('SELECT * FROM users WHERE eid = ?', (eid,)).fetchone()
-    conn.close()
     if user_data:
         return User(
             eid=user_data['eid'],
@@ -30,16 +30,12 @@ def find_user(eid):
         )
     return None
 
-# Function to hash password
-def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
 # GET: Retrieve all users
 @users_bp.route(USERS_AR, methods=[GET_M])
+@conditional('users')
 def get_users():
-    conn = get_db_connection()
+    conn = get_db()
     users_data = conn.execute('SELECT * FROM users').fetchall()
-    conn.close()
     users = [User(
         eid=user['eid'],
         first_name=user['first_name'],
@@ -51,6 +47,7 @@ def get_users():
 
 # GET: Retrieve a specific user by eid
 @users_bp.route(f'{USERS_AR}/<eid>', methods=[GET_M])
+@conditional('users')
 def get_user(eid):
     user = find_user(eid)
     if user:
@@ -80,11 +77,10 @@ def create_user():
     hashed_password = hash_password(password)
     new_user = User(eid=eid, first_name=first_name, last_name=last_name, password=hashed_password, role=Role[role])
     
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute('INSERT INTO users (eid, first_name, last_name, password, role) VALUES (?, ?, ?, ?, ?)',
                  (new_user.eid, new_user.first_name, new_user.last_name, new_user.password, new_user.role.name))
     conn.commit()
-    conn.close()
 
     return jsonify(new_user.to_dict()), 201
 
@@ -98,20 +94,23 @@ def update_user(eid):
     data = request.get_json()
     first_name = data.get("first_name", user.first_name)
     last_name = data.get("last_name", user.last_name)
-    password = data.get("password", user.password)
+    password = data.get("password")
     role = data.get("role", user.role.name)
 
     if role not in Role.__members__:
         abort(400, description="Invalid role")
 
-    hashed_password = hash_password(password)
+    # Only a new password is hashed; an omitted one, or the stored hash sent back, is kept as is
+    if not password or password == user.password:
+        hashed_password = user.password
+    else:
+        hashed_password = hash_password(password)
     updated_user = User(eid=eid, first_name=first_name, last_name=last_name, password=hashed_password, role=Role[role])
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute('UPDATE users SET first_name = ?, last_name = ?, password = ?, role = ? WHERE eid = ?',
                  (updated_user.first_name, updated_user.last_name, updated_user.password, updated_user.role.name, updated_user.eid))
     conn.commit()
-    conn.close()
 
     return jsonify(updated_user.to_dict())
 
@@ -120,10 +119,9 @@ def update_user(eid):
 def delete_user(eid):
     user = find_user(eid)
     if user:
-        conn = get_db_connection()
+        conn = get_db()
         conn.execute('DELETE FROM users WHERE eid = ?', (eid,))
         conn.commit()
-        conn.close()
         return jsonify({"message": "User deleted successfully"})
     else:
         abort(404, description="User not found")
@@ -134,31 +132,9 @@ UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 @users_bp.route('/submit-certification', methods=[POST_M])
+@invalidates('check_certifications')
 def submit_certification():
-    # conn = get_db_connection()  # Change 'certifications.db' to your database name
-    # cursor = conn.cursor()
-    # cursor.execute('''
-    #     DROP TABLE check_certifications
-    # ''')
-
-    # conn.commit()
-    # conn.close()
-    conn = get_db_connection()  # Change 'certifications.db' to your database name
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS check_certifications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            employees_cert_id INTEGER,
-            certification TEXT,
-            file_path TEXT,
-            status TEXT DEFAULT 'Pending',
-            EID TEXT
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
-
+    # check_certifications is created by the startup migrations (db/migrations.py)
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
 
@@ -178,85 +154,92 @@ def submit_certification():
         file.save(file_path)
 
         # Save data to the database
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute(
             'INSERT INTO check_certifications (employees_cert_id, certification, file_path, status, EID) VALUES (?, ?, ?, ?, ?)',
             (employees_cert_id, certification, file_path, status, eid)
         )
         conn.commit()
-        conn.close()
 
         return jsonify({'message': 'Certification submitted successfully'}), 200
 
     return jsonify({'error': 'Failed to upload file'}), 500
 
 @users_bp.route('/approve-certification', methods=['POST'])
+@token_required(roles=REVIEWERS)
+@invalidates('check_certifications', 'employees_certs')
 def approve_certification():
     data = request.json
-    print(data)
     employees_cert_id = data.get('employees_cert_id')
     
     if not employees_cert_id:
         return jsonify({'error': 'Employee Certification ID is required'}), 400
+    try:
+        employees_cert_id = int(employees_cert_id)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Employee Certification ID must be an integer'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Update status to 'Approved' in check_certifications
-    cursor.execute('''
-        UPDATE check_certifications
-        SET status = 'Approved'
-        WHERE employees_cert_id = ?
-        AND status = 'Pending'
-    ''', (employees_cert_id,))
-    
-    # Update CURRENT_PROGRESS to 'Passed' in employee_certs
-    cursor.execute('''
-        UPDATE employees_certs
-        SET CURRENT_PROGRESS = 'Passed'
-        WHERE employees_cert_id = ?
-    ''', (employees_cert_id,))
-    
-    conn.commit()
-    updated_rows_check_certifications = cursor.rowcount
-
-    # Check how many rows were updated in the employee_certs table
-    cursor.execute('''
-        SELECT changes()
-    ''')
-    updated_rows_employee_certs = cursor.fetchone()[0]
+    result, = review_certifications(get_db(), [employees_cert_id], 'approve')
 
-    conn.close()
-    
-    if updated_rows_check_certifications == 0:
+    if result['status'] == 'not_pending':
         return jsonify({'error': 'Certification not found or already approved'}), 404
 
-    if updated_rows_employee_certs == 0:
+    if result['status'] == 'not_found':
         return jsonify({'error': 'Failed to update CURRENT_PROGRESS in employee_certs'}), 500
 
     return jsonify({'message': 'Certification approved and progress updated successfully'}), 200
 
+@users_bp.route('/review-certifications', methods=[POST_M])
+@token_required(roles=REVIEWERS)
+@invalidates('check_certifications', 'employees_certs')
+def review_certifications_batch():
+    """
+    Approve or reject the pending submissions of many certifications in one transaction:
+    {"employees_cert_ids": [12, 13], "decision": "approve" | "reject"}
+    """
+    data = request.get_json(silent=True) or {}
+    employees_cert_ids = data.get('employees_cert_ids')
+    decision = data.get('decision')
+
+    if decision not in REVIEW_DECISIONS:
+        return jsonify({'error': f"decision must be one of: {', '.join(REVIEW_DECISIONS)}"}), 400
+    if not isinstance(employees_cert_ids, list) or not employees_cert_ids:
+        return jsonify({'error': 'A non-empty list of employees_cert_ids is required'}), 400
+    if len(employees_cert_ids) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} certifications per request'}), 400
+    if not all(isinstance(cert_id, int) and not isinstance(cert_id, bool) for cert_id in employees_cert_ids):
+        return jsonify({'error': 'employees_cert_ids must be integers'}), 400
+
+    results = review_certifications(get_db(), employees_cert_ids, decision)
+    reviewed = sum(1 for result in results if result['status'] == REVIEW_DECISIONS[decision])
+    return jsonify({'results': results, 'reviewed': reviewed, 'failed': len(results) - reviewed}), 200
+
 
 @users_bp.route('/get-pending-certifications', methods=['GET'])
+@conditional('check_certifications')
+@cached('check_certifications')
 def get_pending_certifications():
-    conn = get_db_connection()
+    conn = get_db()
     cursor = conn.cursor()
     
-    # Fetch all pending certifications
+    # Fetch the pending certifications, only those submitted after `after_id` when it is given
+    after_id = request.args.get('after_id', type=int)
     cursor.execute('''
         SELECT * FROM check_certifications
         WHERE status = 'Pending'
-    ''')
+        AND id > ?
+        ORDER BY id
+    ''', (after_id or 0,))
     
     certifications = cursor.fetchall()
-    conn.close()
 
     # Convert rows to dictionaries
     column_names = [description[0] for description in cursor.description]
     certifications_list = [dict(zip(column_names, row)) for row in certifications]
 
-    if not certifications_list:
+    # An incremental refresh with nothing new is not an error
+    if not certifications_list and after_id is None:
         return jsonify({'message': 'No pending certifications found'}), 404
 
     return jsonify(certifications_list), 200
@@ -4,4 +4,6 @@ SESSION_AR = "/api/session"
 EMPLOYEES_AR = '/api/employees'
 LLM_AR = '/api/llm_query'
 INGEST_AR = '/api/ingest'
-EVENTS_AR = '/api/events'
\ No newline at end of file
+EVENTS_AR = '/api/events'
+CACHE_AR = '/api/cache'
+JOBS_AR = '/api/jobs'
\ No newline at end of file
@@ -1,10 +1,87 @@
 import os
 
 DATABASE_PATH = './data/output/project_database.db'
+DDL_PATH = './SQL/DDL'
 
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 CHAT_COMPLETIONS_DEPLOYMENT_NAME = os.getenv("CHAT_COMPLETIONS_DEPLOYMENT_NAME")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_VERSION = os.getenv("OPENAI_API_VERSION")
 AI_ROLE = "You are a helpful assistant. Your answer is to interpret the data fetched from our database. Reply any excuses or replies if the user asks unrelevant questions"
-AI_ROLE_QUERY = "Your job is to convert the question to SQL query to access our database"
\ No newline at end of file
+AI_ROLE_QUERY = "Your job is to convert the question to SQL query to access our database"
+
+# SQLite connection tuning, applied once per pooled connection
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", 16384))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 268435456))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 16))
+
+# In-process response cache for read endpoints (number of responses kept)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+
+# Bulk CSV ingest: rows per executemany batch and page cache used while loading
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", 10000))
+INGEST_CACHE_SIZE_KB = int(os.getenv("INGEST_CACHE_SIZE_KB", 65536))
+
+# Background jobs: worker threads, and where uploads and results are kept while a job needs them
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOBS_PATH = './data/jobs'
+
+# Sessions: lifetime, the in-memory cache in front of the sessions table, and the background
+# thread that writes last_accessed in batches (seconds) and deletes expired rows in batches
+SESSION_TTL_MINUTES = int(os.getenv("SESSION_TTL_MINUTES", 60))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 4096))
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", 30))
+SESSION_FLUSH_INTERVAL = int(os.getenv("SESSION_FLUSH_INTERVAL", 5))
+SESSION_SWEEP_INTERVAL = int(os.getenv("SESSION_SWEEP_INTERVAL", 300))
+SESSION_SWEEP_BATCH = int(os.getenv("SESSION_SWEEP_BATCH", 500))
+
+# Signed login tokens (HS256 with SECRET_KEY, shared with the frontend so it can validate them too)
+JWT_ALGORITHM = 'HS256'
+JWT_TTL_MINUTES = int(os.getenv("JWT_TTL_MINUTES", 60))
+# Seconds a worker may go without picking up tokens revoked (at logout) by the other workers
+TOKEN_REVOCATION_POLL_SECONDS = float(os.getenv("TOKEN_REVOCATION_POLL_SECONDS", 2))
+
+# Password hashing: bcrypt work factor, the threads that run it, and how many hash or verify calls
+# may wait or run at once before new logins are turned away with 503
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 4))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", 64))
+
+# Production server (gunicorn.conf.py): worker processes, threads per worker, and the seconds a
+# request may take (LLM calls are slow) and workers get to finish in-flight requests on shutdown
+WEB_BIND = os.getenv("WEB_BIND", "127.0.0.1:5000")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 4))
+WEB_THREADS = int(os.getenv("WEB_THREADS", 8))
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 120))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", 0))
+# Indented JSON responses are for reading in a browser; they cost time and bytes in production
+JSON_PRETTYPRINT = os.getenv("JSON_PRETTYPRINT", "false").lower() in ("1", "true", "yes")
+# JSON encoder for responses: 'orjson', or 'stdlib' for Flask's default json module
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+
+# Response compression: bodies smaller than COMPRESS_MIN_SIZE bytes are not worth it, compressed
+# bodies of ETagged responses are kept for reuse, and brotli is only offered when it is installed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE", 64))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+COMPRESS_MIMETYPES = (
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+    'application/vnd.apache.arrow.stream',
+)
+
+# LLM calls: how many run upstream at once per worker, how many may wait or run before new
+# questions are turned away with 503, and the seconds one call (including retries) may take.
+# Each pending call holds a request thread, so LLM_MAX_PENDING must stay below WEB_THREADS
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", 4))
+LLM_MAX_PENDING = int(os.getenv("LLM_MAX_PENDING", max(1, WEB_THREADS - 2)))
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 1))
+
+# Generated SQL per question: how long an entry is reused, how many are kept in memory in front of
+# the sql_query_cache table, and how often (seconds) the hit counts gathered in memory are written to it
+SQL_CACHE_TTL_HOURS = int(os.getenv("SQL_CACHE_TTL_HOURS", 168))
+SQL_CACHE_SIZE = int(os.getenv("SQL_CACHE_SIZE", 512))
+SQL_CACHE_FLUSH_INTERVAL = int(os.getenv("SQL_CACHE_FLUSH_INTERVAL", 30))
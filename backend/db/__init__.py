@@ -1,7 +1,93 @@
 import sqlite3
-from constants.config import DATABASE_PATH
+import threading
+from queue import LifoQueue, Empty, Full
+from flask import g
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
+from constants.config import DATABASE_PATH, DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_POOL_SIZE
+
+def configure_connection(conn):
+    """Apply the per-connection PRAGMAs once, right after the connection is opened."""
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}')
+    # Negative cache_size is expressed in KiB instead of pages
+    conn.execute(f'PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size = {int(DB_MMAP_SIZE)}')
     return conn
+
+def get_db_connection():
+    """Open a standalone, configured connection. The caller is responsible for closing it."""
+    conn = sqlite3.connect(DATABASE_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+    return configure_connection(conn)
+
+
+class ConnectionPool:
+    """
+    Keeps a bounded set of configured connections alive between requests.
+
+    A connection is owned by exactly one thread between acquire() and release(),
+    so it is safe to open it with check_same_thread=False and hand it to whichever
+    worker thread picks it up next.
+    """
+
+    def __init__(self, database_path, max_idle=DB_POOL_SIZE):
+        self.database_path = database_path
+        self._idle = LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        with self._lock:
+            self.created += 1
+        return configure_connection(conn)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            return self._connect()
+
+    def release(self, conn):
+        # Never hand a connection with an open transaction to the next request
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        try:
+            self._idle.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+
+pool = ConnectionPool(DATABASE_PATH)
+
+def get_db():
+    """Return the connection bound to the current request, acquiring one from the pool on first use."""
+    if 'db' not in g:
+        g.db = pool.acquire()
+    return g.db
+
+def close_db(e=None):
+    """Return the request's connection to the pool at the end of the app context."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        pool.release(conn)
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,60 @@
+# events keeps its dates as the text the UI sends ('8/29/2024' and '3:00PM'), which neither sorts
+# nor compares. start_at / end_at hold the same instants as ISO-8601 ('2024-08-29T15:00'), so a
+# date-range query is a plain indexed string comparison. Every write path keeps them in step.
+from datetime import datetime
+
+EVENT_TEXT_FORMAT = '%m/%d/%Y %I:%M%p'
+EVENT_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M'
+
+# Normalized column -> the (date, time) text columns it is computed from
+EVENT_TIME_COLUMNS = {
+    'start_at': ('start_date', 'start_time'),
+    'end_at': ('end_date', 'end_time'),
+}
+
+def event_timestamp(date_str, time_str):
+    """'8/29/2024', '3:00PM' -> '2024-08-29T15:00', or None when the text does not parse."""
+    try:
+        return datetime.strptime(f"{date_str} {time_str}", EVENT_TEXT_FORMAT).strftime(EVENT_TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+def ensure_event_time_columns(conn, table_name='events'):
+    """Add start_at / end_at to an events table that does not have them yet (e.g. an older generation)."""
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    for column in EVENT_TIME_COLUMNS:
+        if column not in columns:
+            conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN {column} TEXT')
+
+def fill_event_times(conn, table_name='events', event_ids=None):
+    """
+    Compute start_at / end_at from the text columns, for event_ids or else for every row missing them.
+    Rows whose text does not parse are left NULL and simply never match a date range.
+    """
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    sources = [column for pair in EVENT_TIME_COLUMNS.values() for column in pair]
+    if not set(sources) <= columns:
+        return
+
+    if event_ids is None:
+        rows = conn.execute(f'''
+            SELECT event_id, {', '.join(sources)} FROM "{table_name}"
+            WHERE start_at IS NULL OR end_at IS NULL
+        ''').fetchall()
+    else:
+        rows = []
+        event_ids = list(event_ids)
+        for start in range(0, len(event_ids), 500):
+            chunk = event_ids[start:start + 500]
+            rows.extend(conn.execute(
+                f"SELECT event_id, {', '.join(sources)} FROM \"{table_name}\" WHERE event_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ).fetchall())
+
+    conn.executemany(
+        f'UPDATE "{table_name}" SET start_at = ?, end_at = ? WHERE event_id = ?',
+        [
+            (event_timestamp(row[1], row[2]), event_timestamp(row[3], row[4]), row[0])
+            for row in rows
+        ],
+    )
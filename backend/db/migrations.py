@@ -0,0 +1,172 @@
+import os
+import time
+import sqlite3
+
+from db import get_db_connection
+from db.schema import BASE_TABLES_DDL, JOBS_DDL, SQL_QUERY_CACHE_DDL, REVOKED_TOKENS_DDL
+from db.versions import DATA_VERSIONS_DDL, ensure_change_triggers
+from db.event_times import ensure_event_time_columns, fill_event_times
+from constants.config import DDL_PATH
+
+# Hot-path indexes as (index name, table, columns). Column order matters:
+# the leading column serves the equality lookup, the rest make the index covering.
+HOT_PATH_INDEXES = [
+    # get_employee_by_id, update_progress and the ORDER BY EID in get_employees
+    ('idx_employees_certs_eid_target', 'employees_certs', ['EID', 'TARGET_CERTIFICATION']),
+    # MANAGER_EID filters (my_team, certification filters)
+    ('idx_employees_certs_manager', 'employees_certs', ['MANAGER_EID', 'EID']),
+    # employees_certs ⋈ certifications in get_certifications
+    ('idx_certifications_name_level', 'certifications', ['Certification_Name', 'Certification_Level']),
+    # get_pending_certifications and approve_certification
+    ('idx_check_certifications_status', 'check_certifications', ['status', 'employees_cert_id']),
+    ('idx_check_certifications_cert_id', 'check_certifications', ['employees_cert_id', 'status']),
+    # GET /api/events?start=&end=, events overlapping the calendar window
+    ('idx_events_start_end', 'events', ['start_at', 'end_at']),
+    # The session sweeper's expired-row deletes
+    ('idx_sessions_expiration', 'sessions', ['expiration_date']),
+]
+
+def _table_columns(conn, table_name):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+
+def _indexed_columns(conn, table_name, unique_only=False):
+    """Column tuples already covered by an index on the table, whatever the index is named."""
+    indexed = set()
+    for index in conn.execute(f'PRAGMA index_list("{table_name}")').fetchall():
+        if unique_only and not index[2]:
+            continue
+        info = conn.execute(f'PRAGMA index_info("{index[1]}")').fetchall()
+        indexed.add(tuple(row[2] for row in sorted(info, key=lambda row: row[0])))
+    return indexed
+
+def ensure_indexes(conn, table_name=None, target_table=None, name_suffix=''):
+    """
+    Create the hot-path indexes that apply to the existing tables.
+
+    Ingested tables are recreated from whatever columns the CSV has, so an index is
+    skipped when one of its columns is missing instead of failing the whole run.
+    `target_table` builds table_name's indexes on another physical table (a shadow being loaded);
+    index names are global, so give those a `name_suffix` that no other generation uses.
+    """
+    for index_name, table, columns in HOT_PATH_INDEXES:
+        if table_name is not None and table != table_name:
+            continue
+        physical_table = target_table or table
+        if not set(columns) <= _table_columns(conn, physical_table):
+            continue
+        if tuple(columns) in _indexed_columns(conn, physical_table):
+            continue
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {index_name}{name_suffix} ON "{physical_table}" ({column_list})')
+
+def ensure_unique_index(conn, table_name, columns):
+    """
+    Make sure a UNIQUE index exists on exactly `columns`, as INSERT ... ON CONFLICT requires.
+    Returns the name of the index it created, or None when one was already there.
+    Raises sqlite3.IntegrityError when the table already holds duplicate keys.
+    """
+    if tuple(columns) in _indexed_columns(conn, table_name, unique_only=True):
+        return None
+    # Index names are global and follow a table through a shadow swap, so never reuse one
+    index_name = f"uq_{table_name}_{time.time_ns():x}"
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    conn.execute(f'CREATE UNIQUE INDEX {index_name} ON "{table_name}" ({column_list})')
+    return index_name
+
+def _run_ddl_files(conn):
+    if not os.path.isdir(DDL_PATH):
+        return
+    for file_name in sorted(os.listdir(DDL_PATH)):
+        if not file_name.endswith('.sql'):
+            continue
+        with open(os.path.join(DDL_PATH, file_name), 'r') as file:
+            script = file.read()
+        for statement in script.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+
+def _create_base_tables(conn):
+    for ddl in BASE_TABLES_DDL:
+        conn.execute(ddl)
+    _run_ddl_files(conn)
+
+def _create_hot_path_indexes(conn):
+    ensure_indexes(conn)
+    conn.execute('ANALYZE')
+
+def _create_data_versions(conn):
+    conn.execute(DATA_VERSIONS_DDL)
+    ensure_change_triggers(conn)
+
+def _create_jobs_table(conn):
+    conn.execute(JOBS_DDL)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)')
+
+def _add_event_timestamps(conn):
+    ensure_event_time_columns(conn)
+    fill_event_times(conn)
+    ensure_indexes(conn, 'events')
+
+def _index_session_expiry(conn):
+    ensure_indexes(conn, 'sessions')
+
+def _create_sql_query_cache(conn):
+    conn.execute(SQL_QUERY_CACHE_DDL)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sql_query_cache_expires_at ON sql_query_cache (expires_at)')
+
+def _create_revoked_tokens(conn):
+    conn.execute(REVOKED_TOKENS_DDL)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at)')
+
+# Ordered list of (version, description, migration). Append only; never renumber.
+MIGRATIONS = [
+    (1, 'Create base tables', _create_base_tables),
+    (2, 'Add hot-path indexes', _create_hot_path_indexes),
+    (3, 'Track per-table data versions', _create_data_versions),
+    (4, 'Add background jobs table', _create_jobs_table),
+    (5, 'Add normalized event timestamps', _add_event_timestamps),
+    (6, 'Index session expiry', _index_session_expiry),
+    (7, 'Add NL-to-SQL query cache', _create_sql_query_cache),
+    (8, 'Add revoked login tokens table', _create_revoked_tokens),
+]
+
+def _current_version(conn):
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+def run_migrations(conn=None):
+    """Apply every pending migration, each in its own transaction. Returns the resulting schema version."""
+    owns_connection = conn is None
+    if owns_connection:
+        conn = get_db_connection()
+
+    try:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        for version, description, migration in MIGRATIONS:
+            # IMMEDIATE takes the write lock up front so concurrent workers
+            # starting together apply each migration exactly once
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if version <= _current_version(conn):
+                    conn.rollback()
+                    continue
+                migration(conn)
+                conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (version, description))
+                conn.commit()
+                print(f"Applied migration {version}: {description}")
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+        return _current_version(conn)
+    finally:
+        if owns_connection:
+            conn.close()
@@ -1,19 +1,124 @@
 from db import get_db_connection
 
+# DDL for the tables owned by the application. Tables loaded from CSV
+# (employees_certs, certifications, events) are created here with the
+# same columns the ingest produces so a fresh database can serve requests.
+SESSIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        eid TEXT,
+        role TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        expiration_date TIMESTAMP NOT NULL,  -- Added expiration_date column
+        last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- Tracks last access time
+        is_active BOOLEAN DEFAULT TRUE  -- Indicates if the session is still active
+    )
+'''
+
+USERS_DDL = '''
+    CREATE TABLE IF NOT EXISTS users (
+        eid TEXT PRIMARY KEY,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL
+    )
+'''
+
+CHECK_CERTIFICATIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS check_certifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        employees_cert_id INTEGER,
+        certification TEXT,
+        file_path TEXT,
+        status TEXT DEFAULT 'Pending',
+        EID TEXT
+    )
+'''
+
+EMPLOYEES_CERTS_DDL = '''
+    CREATE TABLE IF NOT EXISTS employees_certs (
+        employees_cert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        EMPLOYEE_ID TEXT, FIRST_NAME TEXT, LAST_NAME TEXT, EID TEXT, MANAGEMENT_LEVEL TEXT, CAPABILITY TEXT,
+        PROJECT_NAME TEXT, MANAGER_EID TEXT, TARGET_CERTIFICATION TEXT, "1ST_TARGET_CERTIFICATION_DATE" TEXT,
+        CURRENT_PROGRESS TEXT, WITH_VOUCHER TEXT, "1ST_TAKE_RESULT" TEXT, RETAKE_EXAM_DATE TEXT, RETAKE_RESULT TEXT,
+        EXPIRATION_DATE TEXT, Fiscal_Year TEXT, Month TEXT, Quarter TEXT, EMPLOYEE_STATUS TEXT
+    )
+'''
+
+CERTIFICATIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS certifications (
+        certification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Certification_Name TEXT, Certification_Level TEXT
+    )
+'''
+
+EVENTS_DDL = '''
+    CREATE TABLE IF NOT EXISTS events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_name TEXT, start_date TEXT, start_time TEXT, end_date TEXT, end_time TEXT, description TEXT,
+        color TEXT,
+        start_at TEXT, end_at TEXT
+    )
+'''
+
+# Background jobs (services/job_service.py). Timestamps are UTC ISO-8601 strings.
+JOBS_DDL = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        params TEXT,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT,
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        pid INTEGER,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        duration_seconds REAL
+    )
+'''
+
+# Generated SQL per normalized question, valid only for the schema fingerprint it was generated against
+SQL_QUERY_CACHE_DDL = '''
+    CREATE TABLE IF NOT EXISTS sql_query_cache (
+        question TEXT NOT NULL,
+        schema_fingerprint TEXT NOT NULL,
+        sql_query TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        last_hit_at TEXT,
+        PRIMARY KEY (question, schema_fingerprint)
+    )
+'''
+
+# Login tokens given up before they expire (services/token_service.py). Every worker polls for rows
+# past the last id it has seen; rows are deleted once the token has expired anyway
+REVOKED_TOKENS_DDL = '''
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        jti TEXT NOT NULL UNIQUE,
+        expires_at REAL NOT NULL
+    )
+'''
+
+BASE_TABLES_DDL = [
+    SESSIONS_DDL,
+    USERS_DDL,
+    CHECK_CERTIFICATIONS_DDL,
+    EMPLOYEES_CERTS_DDL,
+    CERTIFICATIONS_DDL,
+    EVENTS_DDL,
+]
+
 def create_session_table():
     conn = get_db_connection()
     c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            eid TEXT,
-            role TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expiration_date TIMESTAMP NOT NULL,  -- Added expiration_date column
-            last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- Tracks last access time
-            is_active BOOLEAN DEFAULT TRUE  -- Indicates if the session is still active
-        )
-    ''')
+    c.execute(SESSIONS_DDL)
     conn.commit()
     conn.close()
 
@@ -33,15 +138,7 @@ def delete_events_table():
 
 def create_users_table():
     conn = get_db_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            eid TEXT PRIMARY KEY,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL
-        )
-    ''')
+    conn.execute(USERS_DDL)
     conn.commit()
     conn.close()
 
@@ -0,0 +1,52 @@
+# Per-table change counters maintained by triggers. Any committed INSERT, UPDATE or
+# DELETE on a tracked table bumps its version, from any connection or process, so
+# caches can key on the version instead of guessing when data went stale.
+
+TRACKED_TABLES = ['employees_certs', 'certifications', 'events', 'check_certifications', 'users']
+
+DATA_VERSIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+def _table_exists(conn, table_name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()
+    return row is not None
+
+def ensure_change_triggers(conn, table_name=None):
+    """(Re)create the version triggers. Tables recreated by an ingest lose their triggers, so call this afterwards."""
+    for table in TRACKED_TABLES:
+        if table_name is not None and table != table_name:
+            continue
+        if not _table_exists(conn, table):
+            continue
+        conn.execute('INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON "{table}"
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+def drop_change_triggers(conn, table_name):
+    """Drop the version triggers of a table, e.g. before another table is renamed into its place."""
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'DROP TRIGGER IF EXISTS trg_{table_name}_version_{event.lower()}')
+
+def bump_data_version(conn, table_name):
+    """Mark a table as changed by writes the triggers cannot see (e.g. DROP and recreate)."""
+    conn.execute('INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)', (table_name,))
+    conn.execute('UPDATE data_versions SET version = version + 1 WHERE table_name = ?', (table_name,))
+
+def get_data_version(conn, tables):
+    """Return a string identifying the current contents of the given tables, e.g. 'certifications:3;employees_certs:12'."""
+    tables = sorted(tables)
+    placeholders = ', '.join('?' for _ in tables)
+    versions = dict(conn.execute(
+        f'SELECT table_name, version FROM data_versions WHERE table_name IN ({placeholders})', tables
+    ).fetchall())
+    return ';'.join(f"{table}:{versions.get(table, 0)}" for table in tables)
@@ -0,0 +1,27 @@
+# Production server, run from the backend directory:
+#   gunicorn -c gunicorn.conf.py "server:create_app()"
+# The app is built once in the master (migrations, job recovery) and then forked into WEB_WORKERS
+# processes with WEB_THREADS threads each. Every worker opens its own SQLite connections and
+# background threads in post_fork, and flushes and closes them again in worker_exit.
+from constants.config import WEB_BIND, WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS
+
+bind = WEB_BIND
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = 'gthread'
+preload_app = True
+
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+max_requests = WEB_MAX_REQUESTS
+max_requests_jitter = WEB_MAX_REQUESTS // 10
+
+accesslog = '-'
+
+def post_fork(server, worker):
+    from server import init_process
+    init_process()
+
+def worker_exit(server, worker):
+    from server import shutdown_process
+    shutdown_process()
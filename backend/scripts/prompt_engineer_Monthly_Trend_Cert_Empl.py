@@ -80,9 +80,10 @@ def execute_dml_script_from_file(db_path, dml_file, ddl_file):
     con.close()
 
 
-if __name__ == "__main__":
+def main(base_dir='backend'):
+    """Run the whole pipeline. base_dir is the backend directory, relative to the working directory."""
     # Path of the database and your query for its SQL table
-    db_path = 'backend/data/output/project_database.db'
+    db_path = os.path.join(base_dir, 'data/output/project_database.db')
     query = """
     SELECT Month, COUNT(*) AS number_Passed
     FROM database_table
@@ -91,7 +92,7 @@ if __name__ == "__main__":
     """
 
     # Directory to write DML file
-    dml_directory = 'backend/SQL/DML'
+    dml_directory = os.path.join(base_dir, 'SQL/DML')
 
     # Fetch data from the database
     result_list = fetch_data_from_db(db_path, query)
@@ -114,7 +115,11 @@ if __name__ == "__main__":
 
     # Execute DML statements from file
     dml_file_path = os.path.join(dml_directory, dml_file_name)
-    ddl_file_path = 'backend/SQL/DDL/create_Monthly_Trend_Cert_Empl.sql'
+    ddl_file_path = os.path.join(base_dir, 'SQL/DDL/create_Monthly_Trend_Cert_Empl.sql')
     execute_dml_script_from_file(db_path, dml_file_path, ddl_file_path)
 
-    print("DML Statements executed successfully")
\ No newline at end of file
+    print("DML Statements executed successfully")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,16 @@ from flask import Flask
 import os
 from dotenv import load_dotenv
 
+from db import init_app as init_db, pool
+from db.migrations import run_migrations
+from services.job_service import recover_interrupted_jobs, job_runner
+from services.llm_service import llm_runner
+from services.session_store import session_store
+from services.sql_cache_service import sql_query_cache
+from services.json_provider import FastJSONProvider
+from services.compression_service import init_app as init_compression
+from constants.config import JSON_PRETTYPRINT, WEB_THREADS
+
 from api.auth_api import auth_bp
 from api.users_api import users_bp
 from api.session_api import session_bp
@@ -9,23 +19,75 @@ from api.employees_api import employees_bp
 from api.llm_query_api import llm_query_bp
 from api.ingest_data_api import ingest_data_bp
 from api.events_api import events_bp
+from api.cache_api import cache_bp
+from api.jobs_api import jobs_bp
 
 
 # Load environment variables
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 
-app = Flask(__name__)
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+def create_app():
+    """
+    Build the application. Under gunicorn this runs once in the master before the workers are forked
+    (preload_app), so migrations and job recovery happen once; init_process() then runs in each worker.
+    """
+    # Every worker signs and verifies login tokens with this key, so refuse to start without it
+    if not SECRET_KEY:
+        raise RuntimeError("SECRET_KEY is not set; add it to the environment or .env (the frontend needs the same value)")
+
+    # A request thread waits out every pending LLM call; keep at least one free for everything else
+    if llm_runner.max_pending >= WEB_THREADS:
+        raise RuntimeError(f"LLM_MAX_PENDING ({llm_runner.max_pending}) must be below WEB_THREADS ({WEB_THREADS})")
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.json.compact = not JSON_PRETTYPRINT
+
+    # Bring the schema up to date once, before any request is served
+    run_migrations()
+
+    # Jobs left queued or running by a server that has since stopped will never finish
+    recover_interrupted_jobs()
+
+    # Hand out pooled connections per request and return them on teardown
+    init_db(app)
+
+    # gzip (or brotli) large and streamed responses for clients that accept it
+    init_compression(app)
+
+    # Register API blueprints
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(session_bp)
+    app.register_blueprint(users_bp)
+    app.register_blueprint(employees_bp)
+    app.register_blueprint(llm_query_bp)
+    app.register_blueprint(ingest_data_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(cache_bp)
+    app.register_blueprint(jobs_bp)
+
+    return app
+
+def init_process():
+    """Per-process setup, run in every worker after the fork and before it serves a request."""
+    # SQLite connections must not cross a fork: drop any the parent left in the pool, the worker opens its own
+    pool.close_all()
+
+    # Write session accesses in batches and delete expired sessions in the background.
+    # Threads do not survive a fork, so each worker starts its own.
+    session_store.start()
 
-# Register API blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(session_bp)
-app.register_blueprint(users_bp)
-app.register_blueprint(employees_bp)
-app.register_blueprint(llm_query_bp)
-app.register_blueprint(ingest_data_bp)
-app.register_blueprint(events_bp)
+def shutdown_process():
+    """Run when a worker stops: flush pending session and SQL cache writes, stop background jobs and close connections."""
+    session_store.stop()
+    sql_query_cache.flush()
+    job_runner.shutdown()
+    llm_runner.stop()
+    pool.close_all()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Development server; run production with: gunicorn -c gunicorn.conf.py "server:create_app()"
+    app = create_app()
+    init_process()
+    app.run(debug=True)
@@ -0,0 +1,36 @@
+import pyarrow as pa
+from flask import Response
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+JSON_MIMETYPE = 'application/json'
+
+def wants_arrow(request):
+    """
+    True when the client prefers an Arrow IPC stream over JSON.
+    JSON is listed first so that `*/*` and missing Accept headers keep getting JSON.
+    """
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, ARROW_STREAM_MIMETYPE]) == ARROW_STREAM_MIMETYPE
+
+def _column_array(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite columns are loosely typed; fall back to text when a column mixes types
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+def rows_to_table(columns, rows):
+    """Build an Arrow table column by column from DB-API rows."""
+    return pa.table({
+        column: _column_array([row[index] for row in rows])
+        for index, column in enumerate(columns)
+    })
+
+def arrow_response(table, status=200):
+    """Serialize an Arrow table as an IPC stream response."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = Response(sink.getvalue().to_pybytes(), status=status, mimetype=ARROW_STREAM_MIMETYPE)
+    response.vary.add('Accept')
+    return response
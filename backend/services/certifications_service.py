@@ -0,0 +1,408 @@
+import csv
+import io
+import json
+import threading
+from cachetools import LRUCache
+
+from db.versions import get_data_version
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Tables the certifications listing reads; their combined data version keys the caches below
+CERTIFICATIONS_TABLES = ['employees_certs', 'certifications']
+
+CERTIFICATIONS_FROM = """
+    FROM
+        employees_certs AS ec
+    INNER JOIN
+        certifications AS ce
+    ON
+        ec.TARGET_CERTIFICATION = ce.Certification_Name
+"""
+
+# Query parameter -> column it filters on. Every filter accepts one or more values.
+CERTIFICATION_FILTERS = {
+    'eid': 'ec.EID',
+    'certification': 'ec.TARGET_CERTIFICATION',
+    'status': 'ec.EMPLOYEE_STATUS',
+    'progress': 'ec.CURRENT_PROGRESS',
+    'management_level': 'ec.MANAGEMENT_LEVEL',
+    'capability': 'ec.CAPABILITY',
+    'level': 'ce.Certification_Level',
+    'fiscal_year': 'ec.Fiscal_Year',
+    'quarter': 'ec.Quarter',
+    'month': 'ec.Month',
+    'project': 'ec.PROJECT_NAME',
+    'manager': 'ec.MANAGER_EID',
+}
+
+# employees_certs columns a client may write (update_certification and the batch endpoint)
+CERTIFICATION_FIELDS = [
+    'FIRST_NAME', 'LAST_NAME', 'EID', 'EMPLOYEE_ID', 'MANAGER_EID', 'MANAGEMENT_LEVEL',
+    'CAPABILITY', 'EMPLOYEE_STATUS', 'WITH_VOUCHER', 'CURRENT_PROGRESS',
+    'TARGET_CERTIFICATION', '1ST_TARGET_CERTIFICATION_DATE', 'RETAKE_EXAM_DATE',
+    'EXPIRATION_DATE', 'FISCAL_YEAR', 'QUARTER', 'MONTH', 'PROJECT_NAME'
+]
+
+MAX_BATCH_SIZE = 5000
+BATCH_OPERATIONS = ['insert', 'patch', 'delete']
+
+# Review decision -> status given to the pending check_certifications submissions
+REVIEW_DECISIONS = {'approve': 'Approved', 'reject': 'Rejected'}
+
+# Columns matched by the free-text `search` parameter
+SEARCH_COLUMNS = ['ec.EID', 'ec.EMPLOYEE_ID', 'ec.FIRST_NAME', 'ec.LAST_NAME']
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def build_certification_filters(args):
+    """
+    Translate request query parameters (a werkzeug MultiDict) into WHERE clauses and their parameters.
+    Unknown parameters are ignored; column names only ever come from CERTIFICATION_FILTERS.
+    """
+    clauses = []
+    params = []
+
+    search = (args.get('search') or '').strip()
+    if search:
+        pattern = f"%{_escape_like(search)}%"
+        clauses.append('(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS) + ')')
+        params.extend([pattern] * len(SEARCH_COLUMNS))
+
+    for name, column in CERTIFICATION_FILTERS.items():
+        values = [value for value in args.getlist(name) if value != '']
+        if len(values) == 1:
+            clauses.append(f"{column} = ?")
+            params.append(values[0])
+        elif values:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+
+    return clauses, params
+
+def _where(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+def _parse_cursor(cursor):
+    employees_cert_id, certification_id = str(cursor).split(':', 1)
+    return int(employees_cert_id), int(certification_id)
+
+def count_certifications(conn, args):
+    """Number of rows the filtered certifications listing returns."""
+    clauses, params = build_certification_filters(args)
+    return conn.execute(f"SELECT COUNT(*) {CERTIFICATIONS_FROM} {_where(clauses)}", params).fetchone()[0]
+
+def fetch_certifications_page(conn, args, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of the certifications listing using keyset pagination.
+
+    Rows are ordered by (employees_cert_id, certification_id) because a certification name can
+    appear more than once in `certifications`. `after` is the next_cursor returned with the previous page.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses, params = build_certification_filters(args)
+
+    total = count_certifications(conn, args)
+
+    page_clauses = list(clauses)
+    page_params = list(params)
+    if after:
+        page_clauses.append('(ec.employees_cert_id, ce.certification_id) > (?, ?)')
+        page_params.extend(_parse_cursor(after))
+
+    # Fetch one extra row to know whether another page exists
+    rows = conn.execute(f"""
+        SELECT
+            ec.*,
+            ce.Certification_Level,
+            ce.certification_id AS _certification_id
+        {CERTIFICATIONS_FROM}
+        {_where(page_clauses)}
+        ORDER BY ec.employees_cert_id, ce.certification_id
+        LIMIT ?
+    """, page_params + [limit + 1]).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = f"{rows[-1]['employees_cert_id']}:{rows[-1]['_certification_id']}" if has_more else None
+
+    certifications = []
+    for row in rows:
+        certification = dict(row)
+        del certification['_certification_id']
+        certifications.append(certification)
+
+    return {
+        'certifications': certifications,
+        'next_cursor': next_cursor,
+        'total': total,
+        'limit': limit,
+    }
+
+def iter_certifications_export(conn, args, export_format='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the filtered certifications as CSV or NDJSON text, one chunk of rows at a time,
+    so memory use stays flat regardless of how many rows match.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    clauses, params = build_certification_filters(args)
+    cursor = conn.execute(f"""
+        SELECT
+            ec.*,
+            ce.Certification_Level
+        {CERTIFICATIONS_FROM}
+        {_where(clauses)}
+        ORDER BY ec.employees_cert_id, ce.certification_id
+    """, params)
+    columns = [description[0] for description in cursor.description]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(columns)
+
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        if export_format == 'csv':
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(dict(zip(columns, row))))
+                buffer.write('\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Headers only (CSV) or nothing (NDJSON) when no row matched
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+def fetch_certification_filter_options(conn):
+    """Distinct values for each filter column, used to populate the sidebar selectboxes."""
+    options = {}
+    for name, column in CERTIFICATION_FILTERS.items():
+        if name == 'eid':
+            continue
+        rows = conn.execute(f"""
+            SELECT DISTINCT {column}
+            {CERTIFICATIONS_FROM}
+            WHERE {column} IS NOT NULL
+            ORDER BY {column}
+        """).fetchall()
+        options[column.split('.', 1)[1]] = [row[0] for row in rows]
+    return options
+
+# Grouped counts keyed by (dimensions, normalized filters, data version). A write bumps the
+# data version, so stale entries are simply never looked up again and age out of the LRU.
+_aggregate_cache = LRUCache(maxsize=256)
+_aggregate_cache_lock = threading.Lock()
+
+def _normalize_filters(args):
+    keys = ['search'] + list(CERTIFICATION_FILTERS)
+    return tuple(
+        (key, tuple(sorted(value for value in args.getlist(key) if value != '')))
+        for key in keys
+        if any(value != '' for value in args.getlist(key))
+    )
+
+def aggregate_certifications(conn, dimensions, args):
+    """
+    Count the filtered certifications grouped by each requested dimension.
+    Dimensions are the same names as the filters (e.g. level, progress, project) and must be whitelisted.
+    Returns ({dimension: [{'value': ..., 'count': ...}]}, data_version).
+    """
+    unknown = [dimension for dimension in dimensions if dimension not in CERTIFICATION_FILTERS]
+    if unknown:
+        raise ValueError(f"Unsupported dimension(s): {', '.join(unknown)}")
+
+    data_version = get_data_version(conn, CERTIFICATIONS_TABLES)
+    cache_key = (tuple(sorted(set(dimensions))), _normalize_filters(args), data_version)
+
+    with _aggregate_cache_lock:
+        cached = _aggregate_cache.get(cache_key)
+    if cached is not None:
+        return cached, data_version
+
+    clauses, params = build_certification_filters(args)
+    counts = {}
+    for dimension in cache_key[0]:
+        column = CERTIFICATION_FILTERS[dimension]
+        rows = conn.execute(f"""
+            SELECT {column} AS value, COUNT(*) AS count
+            {CERTIFICATIONS_FROM}
+            {_where(clauses + [f"{column} IS NOT NULL"])}
+            GROUP BY {column}
+            ORDER BY count DESC, value
+        """, params).fetchall()
+        counts[dimension] = [{'value': row['value'], 'count': row['count']} for row in rows]
+
+    with _aggregate_cache_lock:
+        _aggregate_cache[cache_key] = counts
+    return counts, data_version
+
+def _existing_certification_ids(conn, ids):
+    existing = set()
+    ids = list(ids)
+    # Stay well below SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = conn.execute(
+            f"SELECT employees_cert_id FROM employees_certs WHERE employees_cert_id IN ({', '.join('?' for _ in chunk)})",
+            chunk,
+        ).fetchall()
+        existing.update(row[0] for row in rows)
+    return existing
+
+def _validate_batch_item(item):
+    """Return (operation, id, fields, error) for one batch item."""
+    if not isinstance(item, dict):
+        return None, None, None, 'Operation must be an object'
+
+    operation = item.get('op')
+    if operation not in BATCH_OPERATIONS:
+        return operation, None, None, f"Unsupported op: {operation}"
+
+    cert_id = item.get('id')
+    # bool is an int subclass, but true/false are not ids
+    if operation != 'insert' and (not isinstance(cert_id, int) or isinstance(cert_id, bool)):
+        return operation, cert_id, None, 'An integer id is required'
+
+    fields = {}
+    if operation != 'delete':
+        fields = {field: value for field, value in (item.get('fields') or {}).items() if field in CERTIFICATION_FIELDS}
+        if not fields:
+            return operation, cert_id, None, 'No valid fields'
+
+    return operation, cert_id, fields, None
+
+def apply_certification_batch(conn, items, atomic=False):
+    """
+    Apply a list of {"op": "insert" | "patch" | "delete", "id": ..., "fields": {...}} to employees_certs
+    in one transaction. Items are grouped by operation and field set so each group is one executemany.
+
+    Returns (results, applied) where results has one entry per item, in order. Invalid items and ids
+    that do not exist are reported and skipped; with atomic=True any such item rolls back the whole batch.
+    """
+    results = []
+    groups = {}
+    for index, item in enumerate(items):
+        operation, cert_id, fields, error = _validate_batch_item(item)
+        result = {'index': index, 'op': operation, 'id': cert_id, 'status': 'error' if error else 'ok'}
+        if error:
+            result['error'] = error
+        else:
+            # Items with the same operation and columns share one prepared statement
+            groups.setdefault((operation, tuple(fields)), []).append((result, fields))
+        results.append(result)
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        targeted = [result['id'] for (operation, _), members in groups.items() if operation != 'insert' for result, _ in members]
+        existing = _existing_certification_ids(conn, targeted)
+
+        for (operation, columns), members in groups.items():
+            if operation != 'insert':
+                for result, _ in members:
+                    if result['id'] not in existing:
+                        result.update({'status': 'not_found', 'error': 'Certification not found'})
+                members = [(result, fields) for result, fields in members if result['status'] == 'ok']
+                if not members:
+                    continue
+
+            if operation == 'insert':
+                column_list = ', '.join(f'"{column}"' for column in columns)
+                statement = f"INSERT INTO employees_certs ({column_list}) VALUES ({', '.join('?' for _ in columns)})"
+                # One execute per row (the statement is prepared once) so each new id comes from its own insert
+                cursor = conn.cursor()
+                for result, fields in members:
+                    cursor.execute(statement, [fields[column] for column in columns])
+                    result['id'] = cursor.lastrowid
+            elif operation == 'patch':
+                set_clause = ', '.join(f'"{column}" = ?' for column in columns)
+                conn.executemany(
+                    f"UPDATE employees_certs SET {set_clause} WHERE employees_cert_id = ?",
+                    [[fields[column] for column in columns] + [result['id']] for result, fields in members],
+                )
+            else:
+                conn.executemany(
+                    'DELETE FROM employees_certs WHERE employees_cert_id = ?',
+                    [(result['id'],) for result, _ in members],
+                )
+
+        applied = sum(1 for result in results if result['status'] == 'ok')
+        if atomic and applied < len(results):
+            conn.rollback()
+            for result in results:
+                if result['status'] == 'ok':
+                    result['status'] = 'rolled_back'
+            return results, 0
+
+        conn.commit()
+        return results, applied
+    except Exception:
+        conn.rollback()
+        raise
+
+def _pending_submission_ids(conn, ids):
+    pending = set()
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = conn.execute(
+            f"SELECT DISTINCT employees_cert_id FROM check_certifications WHERE status = 'Pending' AND employees_cert_id IN ({', '.join('?' for _ in chunk)})",
+            chunk,
+        ).fetchall()
+        pending.update(row[0] for row in rows)
+    return pending
+
+def review_certifications(conn, employees_cert_ids, decision):
+    """
+    Approve or reject the pending submissions of many certifications in one transaction. Approving
+    also marks the certification as Passed in employees_certs.
+
+    Returns one {"id": ..., "status": ...} per distinct id, in order. The status is the new submission
+    status, or 'not_pending' / 'not_found' (with an "error") when nothing was changed for that id.
+    """
+    status = REVIEW_DECISIONS[decision]
+    ids = list(dict.fromkeys(employees_cert_ids))
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        pending = _pending_submission_ids(conn, ids)
+        # Only approving touches employees_certs, so only then does the certification have to exist
+        existing = _existing_certification_ids(conn, pending) if decision == 'approve' else pending
+
+        results = []
+        reviewed = []
+        for cert_id in ids:
+            if cert_id not in pending:
+                results.append({'id': cert_id, 'status': 'not_pending', 'error': 'No pending submission (already reviewed or never submitted)'})
+            elif cert_id not in existing:
+                results.append({'id': cert_id, 'status': 'not_found', 'error': 'Certification not found'})
+            else:
+                results.append({'id': cert_id, 'status': status})
+                reviewed.append(cert_id)
+
+        conn.executemany(
+            "UPDATE check_certifications SET status = ? WHERE employees_cert_id = ? AND status = 'Pending'",
+            [(status, cert_id) for cert_id in reviewed],
+        )
+        if decision == 'approve':
+            conn.executemany(
+                "UPDATE employees_certs SET CURRENT_PROGRESS = 'Passed' WHERE employees_cert_id = ?",
+                [(cert_id,) for cert_id in reviewed],
+            )
+
+        conn.commit()
+        return results
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,129 @@
+import zlib
+import threading
+from flask import request
+from cachetools import LRUCache
+
+from constants.config import COMPRESS_MIN_SIZE, COMPRESS_LEVEL, COMPRESS_MIMETYPES, BROTLI_QUALITY, COMPRESS_CACHE_SIZE
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional; without it every client that accepts gzip gets gzip
+    brotli = None
+
+# Preferred first when the client rates them equally
+SUPPORTED_ENCODINGS = ['br', 'gzip'] if brotli else ['gzip']
+
+class _GzipCompressor:
+    def __init__(self):
+        # wbits 31: deflate with a gzip header and trailer
+        self._compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # Emit everything compressed so far without ending the stream
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+_COMPRESSORS = {'gzip': _GzipCompressor, 'br': _BrotliCompressor}
+
+def _compress(data, encoding):
+    compressor = _COMPRESSORS[encoding]()
+    return compressor.compress(data) + compressor.finish()
+
+# (strong ETag, encoding) -> compressed body. A strong ETag names exactly one body, so cached and
+# conditional responses are compressed once per data version rather than on every request.
+_compressed_bodies = LRUCache(COMPRESS_CACHE_SIZE)
+_compressed_lock = threading.Lock()
+
+def _compress_body(data, encoding, etag):
+    if etag is None:
+        return _compress(data, encoding)
+    key = (etag, encoding)
+    with _compressed_lock:
+        compressed = _compressed_bodies.get(key)
+    if compressed is None:
+        compressed = _compress(data, encoding)
+        with _compressed_lock:
+            _compressed_bodies[key] = compressed
+    return compressed
+
+def _compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing after each so the client keeps receiving data."""
+    compressor = _COMPRESSORS[encoding]()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        # Closing the original iterable runs the stream's own cleanup (e.g. returning its connection)
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def _is_compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or 'Content-Range' in response.headers:
+        return False
+    # send_file responses pass the file through untouched and may answer Range requests
+    if response.direct_passthrough:
+        return False
+    return response.mimetype in COMPRESS_MIMETYPES
+
+def compress_response(response):
+    """
+    Compress text-like responses for clients that accept it: gzip, or brotli when it is installed
+    and preferred. Bodies under COMPRESS_MIN_SIZE bytes are sent as-is; streamed bodies (exports)
+    are always compressed, one chunk at a time.
+    """
+    if not _is_compressible(response):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        compressed = _compress_body(data, encoding, None if weak else etag)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+
+    # Same content, different bytes: the validator can only stay a weak one
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    app.after_request(compress_response)
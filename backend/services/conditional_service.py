@@ -0,0 +1,43 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+
+from db import get_db
+from db.versions import get_data_version
+
+def compute_etag(data_version):
+    """
+    Strong validator for the current request's representation: the data version of the tables it
+    reads, plus everything else the body depends on (path, query string and negotiated Accept).
+    """
+    digest = hashlib.sha1()
+    for part in (data_version, request.full_path, request.headers.get('Accept', '')):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def conditional(*tables):
+    """
+    Answer `If-None-Match` with 304 when none of `tables` changed, without running the view.
+
+    The version is read before the view queries, so a write landing in between can only make the
+    ETag older than the body. The next request then misses and refetches; it never serves stale data.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(get_data_version(get_db(), tables))
+
+            # Weak match: a compressed response carries the same validator, weakened
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
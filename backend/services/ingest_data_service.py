@@ -1,105 +1,378 @@
+import time
 import sqlite3
 import pandas as pd
-from io import StringIO
+from itertools import chain
+from contextlib import contextmanager
 
-from constants.config import DATABASE_PATH
+from db import get_db_connection
+from db.migrations import ensure_indexes, ensure_unique_index
+from db.versions import ensure_change_triggers, drop_change_triggers, bump_data_version
+from db.event_times import EVENT_TIME_COLUMNS, EVENT_TEXT_FORMAT, EVENT_TIMESTAMP_FORMAT, ensure_event_time_columns, fill_event_times
+from constants.config import INGEST_CHUNK_SIZE, INGEST_CACHE_SIZE_KB
+
+# "Create New Table" loads into <table>__shadow and keeps the replaced table as <table>__previous
+SHADOW_SUFFIX = '__shadow'
+PREVIOUS_SUFFIX = '__previous'
+
+# Natural keys "Merge" matches rows on when the upload does not name its own
+NATURAL_KEYS = {
+    'employees_certs': ['EID', 'TARGET_CERTIFICATION'],
+    'certifications': ['Certification_Name', 'Certification_Level'],
+    'events': ['event_name', 'start_date', 'start_time'],
+}
+
+# Columns filled in by the loader when the CSV does not provide them
+DEFAULT_VALUES = {
+    'events': {'color': '#000000'},
+}
+
+def derive_event_times(df):
+    """Add the normalized start_at / end_at (see db/event_times.py) to a chunk of events rows."""
+    for column, (date_column, time_column) in EVENT_TIME_COLUMNS.items():
+        if date_column in df.columns and time_column in df.columns:
+            parsed = pd.to_datetime(
+                df[date_column].astype(str) + ' ' + df[time_column].astype(str),
+                format=EVENT_TEXT_FORMAT, errors='coerce',
+            )
+            df[column] = parsed.dt.strftime(EVENT_TIMESTAMP_FORMAT)
+    return df
+
+# Columns the loader computes from the other columns of each row, whatever the CSV provides
+DERIVED_COLUMNS = {
+    'events': derive_event_times,
+}
 
 def upload_csv(file, table_name, operation):
-    csv_data = file.read().decode('utf-8')
-    
     if operation == "Create New Table":
-        create_table_from_csv(csv_data, table_name)
+        return create_table_from_csv(file.stream, table_name)
     elif operation == "Add Rows to Existing Table":
-        add_rows_to_table(csv_data, table_name)
+        return add_rows_to_table(file.stream, table_name)
+    elif operation == "Merge":
+        return merge_rows_into_table(file.stream, table_name)
     else:
         raise ValueError("Invalid operation selected.")
 
-def create_table_from_csv(csv_data, table_name):
-    # Convert the byte data to a StringIO object
-    csv_data = StringIO(csv_data)
-    
-    # Read CSV into DataFrame
-    df = pd.read_csv(csv_data)
-    
-    # Connect to SQLite database
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Drop the table if it exists
-    cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-    
+# Escape column names for SQLite compatibility
+def escape_column_name(name):
+    # Escape column names that start with a number or contain special characters
+    if name[0].isdigit() or any(c in name for c in [' ', '-', '(', ')', '/', '\\']):
+        return f'"{name}"'
+    return name
+
+def read_csv_chunks(csv_file, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Parse a binary CSV stream incrementally into DataFrames of at most chunk_size rows.
+    Only the current chunk is ever held in memory, whatever the size of the upload.
+    """
+    return pd.read_csv(csv_file, chunksize=chunk_size, encoding='utf-8')
+
+def _table_chunks(csv_file, table_name):
+    """read_csv_chunks() with the table's derived columns added to every chunk."""
+    chunks = read_csv_chunks(csv_file)
+    derive = DERIVED_COLUMNS.get(table_name)
+    return chunks if derive is None else map(derive, chunks)
+
+@contextmanager
+def loader_pragmas(conn):
+    """
+    Trade durability for speed while a bulk load runs, then put the connection back as it was.
+    The load still happens in a single transaction, so a failure leaves the table untouched.
+    """
+    previous = {
+        pragma: conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+        for pragma in ('synchronous', 'temp_store', 'cache_size')
+    }
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute(f'PRAGMA cache_size = -{int(INGEST_CACHE_SIZE_KB)}')
+    try:
+        yield conn
+    finally:
+        for pragma, value in previous.items():
+            conn.execute(f'PRAGMA {pragma} = {int(value)}')
+
+def _chunk_rows(df):
+    # Plain Python values for sqlite3, with pandas NaN stored as NULL
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+def bulk_insert(conn, table_name, columns, chunks, target_table=None, commit_each_chunk=False, on_chunk=None):
+    """
+    Insert every DataFrame chunk with one prepared statement and executemany. Returns the number of rows inserted.
+    `target_table` loads table_name's data into another physical table (a shadow); `commit_each_chunk`
+    releases the write lock between chunks, which is safe when nobody reads the target yet.
+    `on_chunk(rows_so_far)` is called after every chunk; raising from it aborts the load.
+    """
+    defaults = DEFAULT_VALUES.get(table_name, {})
+    extra_columns = [column for column in defaults if column not in columns]
+    extra_values = tuple(defaults[column] for column in extra_columns)
+
+    column_list = ', '.join(map(escape_column_name, list(columns) + extra_columns))
+    placeholders = ', '.join('?' for _ in range(len(columns) + len(extra_columns)))
+    insert_sql = f"INSERT INTO {target_table or table_name} ({column_list}) VALUES ({placeholders})"
+
+    rows = 0
+    for chunk in chunks:
+        values = _chunk_rows(chunk)
+        if extra_values:
+            values = [row + extra_values for row in values]
+        conn.executemany(insert_sql, values)
+        if commit_each_chunk:
+            conn.commit()
+        rows += len(values)
+        if on_chunk is not None:
+            on_chunk(rows)
+    return rows
+
+def bulk_upsert(conn, table_name, columns, key_columns, chunks, on_chunk=None):
+    """
+    Insert new keys and update changed rows with INSERT ... ON CONFLICT DO UPDATE, one executemany per chunk.
+    A row whose stored values already equal the CSV's is left alone. Returns (rows read, rows inserted or updated).
+    Needs a UNIQUE index on key_columns; rows with an empty key column are rejected, since NULL keys never conflict.
+    """
+    defaults = DEFAULT_VALUES.get(table_name, {})
+    extra_columns = [column for column in defaults if column not in columns]
+    extra_values = tuple(defaults[column] for column in extra_columns)
+
+    value_columns = [column for column in columns if column not in key_columns]
+    key_positions = [columns.index(column) for column in key_columns]
+
+    insert_columns = list(columns) + extra_columns
+    column_list = ', '.join(map(escape_column_name, insert_columns))
+    placeholders = ', '.join('?' for _ in insert_columns)
+    key_list = ', '.join(map(escape_column_name, key_columns))
+    if value_columns:
+        assignments = ', '.join(
+            f"{escape_column_name(column)} = excluded.{escape_column_name(column)}"
+            for column in value_columns
+        )
+        # Compare the stored row with the incoming one (after column affinity) so unchanged rows write nothing
+        stored = ', '.join(f"{table_name}.{escape_column_name(column)}" for column in value_columns)
+        incoming = ', '.join(f"excluded.{escape_column_name(column)}" for column in value_columns)
+        conflict_action = f"DO UPDATE SET {assignments} WHERE ({stored}) IS NOT ({incoming})"
+    else:
+        conflict_action = "DO NOTHING"
+    upsert_sql = f"""
+        INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})
+        ON CONFLICT ({key_list}) {conflict_action}
+    """
+
+    rows = 0
+    changed = 0
+    for chunk in chunks:
+        values = [row + extra_values for row in _chunk_rows(chunk)]
+        empty_keys = sum(1 for row in values if any(row[position] is None for position in key_positions))
+        if empty_keys:
+            raise ValueError(
+                f"{empty_keys} row(s) near row {rows + 1} have an empty key column ({', '.join(key_columns)}); "
+                "every merged row needs its full key."
+            )
+        # rowcount sums the rows actually written and, unlike total_changes, ignores the version triggers
+        changed += conn.executemany(upsert_sql, values).rowcount
+        rows += len(values)
+        if on_chunk is not None:
+            on_chunk(rows)
+    return rows, changed
+
+def _load_stats(table_name, rows, started):
+    seconds = time.perf_counter() - started
+    rows_per_sec = rows / seconds if seconds > 0 else float(rows)
+    print(f"Loaded {rows} rows into {table_name} in {seconds:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+    return {'table': table_name, 'rows': rows, 'seconds': round(seconds, 3), 'rows_per_sec': round(rows_per_sec)}
+
+def shadow_table_name(table_name):
+    return f"{table_name}{SHADOW_SUFFIX}"
+
+def previous_table_name(table_name):
+    return f"{table_name}{PREVIOUS_SUFFIX}"
+
+def _table_exists(conn, table_name):
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+def _rename_table(conn, table_name, new_name):
+    conn.execute(f"ALTER TABLE {table_name} RENAME TO {new_name}")
+
+@contextmanager
+def _swap_transaction(conn, table_name):
+    """
+    One short write transaction that moves tables around under table_name.
+    Renames keep indexes attached, but the version triggers are recreated on whatever ends up live.
+    """
+    # Keep references in the rest of the schema pointing at the name, not at the table being moved away
+    conn.execute('PRAGMA legacy_alter_table = ON')
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        drop_change_triggers(conn, table_name)
+        yield conn
+        ensure_change_triggers(conn, table_name)
+        bump_data_version(conn, table_name)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute('PRAGMA legacy_alter_table = OFF')
+
+def create_table_from_csv(csv_file, table_name, on_chunk=None):
+    """
+    Load the CSV into a shadow table, then swap it in atomically. Readers keep seeing the complete
+    previous table for the whole load; the replaced generation is kept as <table>__previous for rollback_table().
+    """
+    started = time.perf_counter()
+    chunks = _table_chunks(csv_file, table_name)
+    first_chunk = next(chunks)
+    shadow_table = shadow_table_name(table_name)
+
     # Remove trailing 's' from table_name if it exists
     if table_name.endswith('s'):
         base_table_name = table_name[:-1] + "_id"
     else:
         base_table_name = table_name + "_id"
-    
-    # Escape column names for SQLite compatibility
-    def escape_column_name(name):
-        # Escape column names that start with a number or contain special characters
-        if name[0].isdigit() or any(c in name for c in [' ', '-', '(', ')', '/', '\\']):
-            return f'"{name}"'
-        return name
 
     # Prepare columns and SQL statements
-    columns = ', '.join([f"{escape_column_name(col)} TEXT" for col in df.columns])
-    
-    print("Columns for table:", columns)
-    
+    columns = ', '.join([f"{escape_column_name(col)} TEXT" for col in first_chunk.columns])
+
     create_table_sql = f"""
-    CREATE TABLE {table_name} (
+    CREATE TABLE {shadow_table} (
         {base_table_name} INTEGER PRIMARY KEY AUTOINCREMENT,
         {columns},
         color TEXT
     )
     """ if table_name == 'events' else f"""
-    CREATE TABLE {table_name} (
+    CREATE TABLE {shadow_table} (
         {base_table_name} INTEGER PRIMARY KEY AUTOINCREMENT,
         {columns}
     )
     """
-    
-    print("Create table SQL:", create_table_sql)
-    cursor.execute(create_table_sql)
-    
-    # Insert rows into the table
-    for index, row in df.iterrows():
-        placeholders = ', '.join(['?' for _ in row])
-        if table_name == 'events':
-            insert_sql = f"INSERT INTO {table_name} ({', '.join(map(escape_column_name, df.columns))}, color) VALUES ({placeholders}, ?)"
-            print("Insert SQL:", insert_sql)
-            cursor.execute(insert_sql, tuple(row) + ('#000000',))  # Default color value if not provided
-        else:
-            insert_sql = f"INSERT INTO {table_name} ({', '.join(map(escape_column_name, df.columns))}) VALUES ({placeholders})"
-            print("Insert SQL:", insert_sql)
-            cursor.execute(insert_sql, tuple(row))  # Default color value if not provided
-    
-    # Commit and close the connection
-    conn.commit()
-    conn.close()
-
-def add_rows_to_table(csv_data, table_name):
-    # Convert the byte data to a StringIO object
-    csv_data = StringIO(csv_data)
-    
-    # Read CSV into DataFrame
-    df = pd.read_csv(csv_data)
-    
-    # Connect to SQLite database
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Check if table exists
-    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-    if cursor.fetchone() is None:
-        raise ValueError(f"Table '{table_name}' does not exist.")
-    
-    # Insert rows into the existing table
-    for index, row in df.iterrows():
-        placeholders = ', '.join(['?' for _ in row])
-        insert_sql = f"INSERT INTO {table_name} ({', '.join(df.columns)}) VALUES ({placeholders})"
-        cursor.execute(insert_sql, tuple(row))
-    
-    # Commit and close the connection
-    conn.commit()
-    conn.close()
+
+    conn = get_db_connection()
+    try:
+        with loader_pragmas(conn):
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+                conn.execute(create_table_sql)
+
+                # Nobody reads the shadow, so commit chunk by chunk instead of holding the write lock for the whole load
+                rows = bulk_insert(
+                    conn, table_name, list(first_chunk.columns), chain([first_chunk], chunks),
+                    target_table=shadow_table, commit_each_chunk=True, on_chunk=on_chunk,
+                )
+
+                # Indexes are built once, after the data is in, rather than maintained row by row.
+                # Index names are global and stay with a table when it is renamed, so each generation gets its own.
+                ensure_indexes(conn, table_name, target_table=shadow_table, name_suffix=f"_{time.time_ns():x}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                conn.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+                raise
+
+            with _swap_transaction(conn, table_name):
+                previous_table = previous_table_name(table_name)
+                conn.execute(f"DROP TABLE IF EXISTS {previous_table}")
+                if _table_exists(conn, table_name):
+                    _rename_table(conn, table_name, previous_table)
+                _rename_table(conn, shadow_table, table_name)
+    finally:
+        conn.close()
+
+    return _load_stats(table_name, rows, started)
+
+def rollback_table(table_name):
+    """Swap the generation replaced by the last "Create New Table" back in. Rolling back twice restores the newer one."""
+    previous_table = previous_table_name(table_name)
+    swap_table = f"{table_name}__swap"
+
+    conn = get_db_connection()
+    try:
+        if not _table_exists(conn, previous_table):
+            raise ValueError(f"Table '{table_name}' has no previous generation to roll back to.")
+
+        with _swap_transaction(conn, table_name):
+            _rename_table(conn, table_name, swap_table)
+            _rename_table(conn, previous_table, table_name)
+            _rename_table(conn, swap_table, previous_table)
+
+            # A generation loaded before the events timestamps existed gets them now
+            if table_name == 'events':
+                ensure_event_time_columns(conn, table_name)
+                fill_event_times(conn, table_name)
+                ensure_indexes(conn, table_name, name_suffix=f"_{time.time_ns():x}")
+    finally:
+        conn.close()
+
+def add_rows_to_table(csv_file, table_name, on_chunk=None):
+    started = time.perf_counter()
+    chunks = _table_chunks(csv_file, table_name)
+    first_chunk = next(chunks)
+
+    conn = get_db_connection()
+    try:
+        # Check if table exists
+        if not _table_exists(conn, table_name):
+            raise ValueError(f"Table '{table_name}' does not exist.")
+
+        with loader_pragmas(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if table_name == 'events':
+                    ensure_event_time_columns(conn, table_name)
+                rows = bulk_insert(conn, table_name, list(first_chunk.columns), chain([first_chunk], chunks), on_chunk=on_chunk)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.close()
+
+    return _load_stats(table_name, rows, started)
+
+def merge_rows_into_table(csv_file, table_name, key_columns=None, on_chunk=None):
+    """
+    Upsert the CSV into an existing table on its natural key: new keys are inserted, changed rows
+    updated, unchanged rows skipped. The UNIQUE index ON CONFLICT needs only exists for the merge;
+    the table keeps accepting duplicate keys from its other write paths afterwards.
+    """
+    started = time.perf_counter()
+    key_columns = list(key_columns or NATURAL_KEYS.get(table_name, []))
+    if not key_columns:
+        raise ValueError(f"Merging into '{table_name}' needs the key columns that identify a row.")
+
+    chunks = _table_chunks(csv_file, table_name)
+    first_chunk = next(chunks)
+    columns = list(first_chunk.columns)
+    missing = [column for column in key_columns if column not in columns]
+    if missing:
+        raise ValueError(f"Key column(s) missing from the CSV: {', '.join(missing)}")
+
+    conn = get_db_connection()
+    try:
+        if not _table_exists(conn, table_name):
+            raise ValueError(f"Table '{table_name}' does not exist.")
+
+        with loader_pragmas(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if table_name == 'events':
+                    ensure_event_time_columns(conn, table_name)
+                try:
+                    merge_index = ensure_unique_index(conn, table_name, key_columns)
+                except sqlite3.IntegrityError:
+                    raise ValueError(
+                        f"Table '{table_name}' already has duplicate rows for ({', '.join(key_columns)}); "
+                        "remove them or reload it with \"Create New Table\" before merging."
+                    )
+
+                rows, changed = bulk_upsert(conn, table_name, columns, key_columns, chain([first_chunk], chunks), on_chunk=on_chunk)
+                if merge_index is not None:
+                    conn.execute(f"DROP INDEX {merge_index}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.close()
+
+    stats = _load_stats(table_name, rows, started)
+    stats.update({'changed': changed, 'unchanged': rows - changed})
+    return stats
@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import uuid
+import threading
+import sqlite3
+import importlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.datastructures import MultiDict
+
+from db import get_db_connection
+from constants.config import JOB_WORKERS, JOBS_PATH
+from services.ingest_data_service import create_table_from_csv, add_rows_to_table, merge_rows_into_table
+from services.certifications_service import count_certifications, iter_certifications_export, EXPORT_CHUNK_SIZE, EXPORT_FORMATS
+from services.response_cache import response_cache
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Analytics pipelines in scripts/ that can be run as jobs
+ANALYTICS_SCRIPTS = [
+    'prompt_engineer_Cert_HiNum_Employees',
+    'prompt_engineer_Monthly_Trend_Cert_Empl',
+    'prompt_engineer_OverallCompletion',
+    'prompt_engineer_TrainedEmployees',
+]
+
+def _now():
+    return datetime.utcnow().isoformat(timespec='seconds')
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+def job_file_path(job_id, extension):
+    """Where a job keeps its input upload or its result file."""
+    os.makedirs(JOBS_PATH, exist_ok=True)
+    return os.path.abspath(os.path.join(JOBS_PATH, f"{job_id}{extension}"))
+
+class JobCancelled(Exception):
+    """Raised at a progress checkpoint once cancellation was requested; the job is recorded as cancelled."""
+
+# Progress of the jobs running in this process that cannot write it yet, and cancellations that could
+# not be written either: job_id -> {'progress', 'message'} / {job_id}. See JobContext.progress().
+_live_progress = {}
+_local_cancels = set()
+_live_lock = threading.Lock()
+
+class JobContext:
+    """Handed to a job handler. Every progress report is also a cancellation checkpoint."""
+
+    def __init__(self, job_id, conn):
+        self.job_id = job_id
+        self._conn = conn
+
+    def progress(self, percent, message=None, persist=True):
+        """
+        Record progress and stop if cancellation was requested. Pass persist=False while another
+        connection of this job holds the write lock (a load in one transaction): writing would wait
+        on that very lock. The value is then only visible from this process until the next write.
+        """
+        percent = round(max(0.0, min(float(percent), 100.0)), 1)
+        if persist:
+            self._conn.execute(
+                'UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE job_id = ?',
+                (percent, message, self.job_id),
+            )
+            self._conn.commit()
+            with _live_lock:
+                _live_progress.pop(self.job_id, None)
+        else:
+            with _live_lock:
+                previous = _live_progress.get(self.job_id, {})
+                _live_progress[self.job_id] = {'progress': percent, 'message': message or previous.get('message')}
+
+        # Reading does not need the write lock (WAL), so the checkpoint works either way
+        with _live_lock:
+            if self.job_id in _local_cancels:
+                raise JobCancelled()
+        row = self._conn.execute('SELECT cancel_requested FROM jobs WHERE job_id = ?', (self.job_id,)).fetchone()
+        if row['cancel_requested']:
+            raise JobCancelled()
+
+# kind -> handler(job, **params)
+_handlers = {}
+
+def job_handler(kind):
+    def decorator(handler):
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+def _job_to_dict(row):
+    job = dict(row)
+    job['params'] = json.loads(job['params']) if job['params'] else {}
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    with _live_lock:
+        job.update(_live_progress.get(job['job_id'], {}))
+        if job['job_id'] in _local_cancels:
+            job['cancel_requested'] = True
+    return job
+
+def get_job(conn, job_id):
+    row = conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+    return _job_to_dict(row) if row else None
+
+def list_jobs(conn, limit=50):
+    rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+    return [_job_to_dict(row) for row in rows]
+
+class JobRunner:
+    """
+    Runs jobs on a small thread pool inside the server process, outside of any request.
+    State lives in the `jobs` table so every worker can report status, and cancellation is
+    cooperative: handlers stop at their next progress report.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, params=None, job_id=None):
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        params = params or {}
+        job_id = job_id or new_job_id()
+
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                'INSERT INTO jobs (job_id, kind, status, params, pid, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, json.dumps(params), os.getpid(), _now()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        future = self._executor.submit(self._run, job_id, kind, params)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+        return job_id
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        with _live_lock:
+            _live_progress.pop(job_id, None)
+            _local_cancels.discard(job_id)
+
+    def _finish(self, conn, job_id, status, started, **fields):
+        if conn.in_transaction:
+            conn.rollback()
+        fields.update({
+            'status': status,
+            'finished_at': _now(),
+            'duration_seconds': round(time.perf_counter() - started, 3),
+        })
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        conn.execute(f'UPDATE jobs SET {assignments} WHERE job_id = ?', list(fields.values()) + [job_id])
+        conn.commit()
+
+    def _run(self, job_id, kind, params):
+        conn = get_db_connection()
+        try:
+            # Claim the job; a cancel that arrived while it was queued wins
+            claimed = conn.execute(
+                'UPDATE jobs SET status = ?, started_at = ? WHERE job_id = ? AND status = ?',
+                (RUNNING, _now(), job_id, QUEUED),
+            ).rowcount
+            conn.commit()
+            if not claimed:
+                return
+
+            started = time.perf_counter()
+            try:
+                result = _handlers[kind](JobContext(job_id, conn), **params)
+            except JobCancelled:
+                self._finish(conn, job_id, CANCELLED, started, message='Cancelled')
+            except Exception as e:
+                self._finish(conn, job_id, FAILED, started, error=str(e))
+            else:
+                self._finish(conn, job_id, SUCCEEDED, started, progress=100, result=json.dumps(result))
+        finally:
+            conn.close()
+
+    def cancel(self, conn, job_id):
+        """Cancel a queued job outright, or ask a running one to stop at its next checkpoint."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            # A job of ours stops at its next checkpoint even while a load holds the write lock,
+            # which the UPDATE below would otherwise wait on until the load is done
+            with _live_lock:
+                _local_cancels.add(job_id)
+
+        try:
+            cancelled = conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, message = ? WHERE job_id = ? AND status = ?',
+                (CANCELLED, _now(), 'Cancelled before it started', job_id, QUEUED),
+            ).rowcount
+            if not cancelled:
+                conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?', (job_id, RUNNING))
+            conn.commit()
+        except sqlite3.OperationalError:
+            # Still locked by a load: ours was told in memory above
+            if conn.in_transaction:
+                conn.rollback()
+            if future is None:
+                raise
+            cancelled = 0
+
+        if future is not None:
+            future.cancel()
+
+        job = get_job(conn, job_id)
+        # A job cancelled before it started never gets to clean up its uploaded input
+        if cancelled and job['params'].get('file_path') and os.path.exists(job['params']['file_path']):
+            os.remove(job['params']['file_path'])
+        return job
+
+    def shutdown(self):
+        """
+        Stop taking jobs when this process is going away: queued ones are cancelled, running ones are
+        asked to stop at their next checkpoint. The interpreter waits for the job threads on exit.
+        """
+        with self._lock:
+            job_ids = list(self._futures)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if not job_ids:
+            return
+
+        conn = get_db_connection()
+        try:
+            for job_id in job_ids:
+                self.cancel(conn, job_id)
+        finally:
+            conn.close()
+
+job_runner = JobRunner()
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def recover_interrupted_jobs(conn=None):
+    """At startup, fail the queued or running jobs whose process is gone; nothing will ever finish them."""
+    owns_connection = conn is None
+    if owns_connection:
+        conn = get_db_connection()
+
+    try:
+        rows = conn.execute('SELECT job_id, pid FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)).fetchall()
+        for row in rows:
+            # This process has not started any job yet, so a row with our pid is from a previous server
+            if row['pid'] and row['pid'] != os.getpid() and _pid_alive(row['pid']):
+                continue
+            conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE job_id = ?',
+                (FAILED, _now(), 'Interrupted: the server process running it stopped', row['job_id']),
+            )
+        conn.commit()
+    finally:
+        if owns_connection:
+            conn.close()
+
+@job_handler('ingest_csv')
+def ingest_csv_job(job, file_path, table_name, operation, key_columns=None):
+    """Load an uploaded CSV saved at file_path; progress follows how far the parser has read."""
+    size = os.path.getsize(file_path) or 1
+    # Add Rows and Merge hold the write lock for the whole load, so their progress is kept in memory until
+    # they commit. Create New Table commits chunk by chunk and can record it as it goes.
+    persist = operation == "Create New Table"
+    try:
+        with open(file_path, 'rb') as csv_file:
+            def on_chunk(rows):
+                job.progress(min(csv_file.tell() * 100 / size, 99), f"{rows} rows loaded", persist=persist)
+
+            if operation == "Create New Table":
+                stats = create_table_from_csv(csv_file, table_name, on_chunk=on_chunk)
+            elif operation == "Add Rows to Existing Table":
+                stats = add_rows_to_table(csv_file, table_name, on_chunk=on_chunk)
+            elif operation == "Merge":
+                stats = merge_rows_into_table(csv_file, table_name, key_columns, on_chunk=on_chunk)
+            else:
+                raise ValueError("Invalid operation selected.")
+    finally:
+        os.remove(file_path)
+
+    response_cache.invalidate([table_name])
+    return stats
+
+@job_handler('certifications_export')
+def certifications_export_job(job, filters=None, export_format='csv'):
+    """Write the filtered certifications export to a result file that can be downloaded later."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    # Filters are stored as {name: value or [values]}, the services expect request args
+    args = MultiDict([
+        (name, value)
+        for name, values in (filters or {}).items()
+        for value in (values if isinstance(values, list) else [values])
+    ])
+
+    path = job_file_path(job.job_id, f".{export_format}")
+    conn = get_db_connection()
+    try:
+        total = count_certifications(conn, args)
+        written = 0
+        with open(path, 'w', newline='') as export_file:
+            for chunk in iter_certifications_export(conn, args, export_format):
+                export_file.write(chunk)
+                written = min(written + EXPORT_CHUNK_SIZE, total)
+                job.progress(written * 100 / total if total else 99, f"{written} of {total} rows written")
+    except JobCancelled:
+        os.remove(path)
+        raise
+    finally:
+        conn.close()
+
+    return {'path': path, 'format': export_format, 'rows': total}
+
+@job_handler('analytics')
+def analytics_job(job, script):
+    """Run one of the scripts/prompt_engineer_* pipelines against the live database."""
+    if script not in ANALYTICS_SCRIPTS:
+        raise ValueError(f"Unknown analytics script: {script}")
+
+    job.progress(5, 'Loading pipeline')
+    module = importlib.import_module(f"scripts.{script}")
+    job.progress(10, 'Querying the database and generating DML')
+    # The server runs from the backend directory
+    module.main(base_dir='.')
+    return {'script': script}
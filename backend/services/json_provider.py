@@ -0,0 +1,76 @@
+import sqlite3
+import orjson
+from flask.json.provider import DefaultJSONProvider, _default
+
+from constants.config import JSON_ENCODER
+
+def _rows_to_dicts(rows):
+    # One key list for the whole result set instead of a keys() call per row
+    keys = rows[0].keys()
+    return [dict(zip(keys, row)) for row in rows]
+
+def _prepare(obj):
+    """
+    Turn lists of sqlite3.Row at the top level, or one level down in a dict ({"employees": rows}),
+    into dicts. Rows anywhere else are still handled, one at a time, by the encoder's default().
+    """
+    if isinstance(obj, (list, tuple)) and obj and isinstance(obj[0], sqlite3.Row):
+        return _rows_to_dicts(obj)
+    if isinstance(obj, dict):
+        return {
+            key: _rows_to_dicts(value) if isinstance(value, (list, tuple)) and value and isinstance(value[0], sqlite3.Row) else value
+            for key, value in obj.items()
+        }
+    return obj
+
+def _default_with_rows(o):
+    if isinstance(o, sqlite3.Row):
+        return dict(zip(o.keys(), o))
+    return _default(o)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson and accepts sqlite3.Row (and lists of rows) as-is,
+    so views can jsonify cursor.fetchall() directly. Output matches the default provider: keys
+    sorted, dates as HTTP dates, compact unless app.json.compact is False. Anything orjson cannot
+    encode (e.g. integers beyond 64 bits), or JSON_ENCODER=stdlib, falls back to the stdlib encoder.
+    """
+
+    default = staticmethod(_default_with_rows)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = JSON_ENCODER == 'orjson'
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, indent=False):
+        obj = _prepare(obj)
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._options(indent))
+            except TypeError:
+                pass
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self.use_orjson:
+            return super().dumps(_prepare(obj), **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs or not self.use_orjson:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -1,16 +1,147 @@
-import openai
-from openai import AzureOpenAI
-from constants.config import CHAT_COMPLETIONS_DEPLOYMENT_NAME, OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, OPENAI_API_VERSION
-
-client = AzureOpenAI(
-    api_key=OPENAI_API_KEY,
-    azure_endpoint=AZURE_OPENAI_ENDPOINT,
-    api_version=OPENAI_API_VERSION,
+import os
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from openai import AsyncAzureOpenAI
+from constants.config import (
+    CHAT_COMPLETIONS_DEPLOYMENT_NAME, OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, OPENAI_API_VERSION,
+    LLM_MAX_CONCURRENT, LLM_MAX_PENDING, LLM_CALL_TIMEOUT, LLM_MAX_RETRIES,
 )
 
 AI_ROLE = "You are a helpful assistant. Your answer is to interpret the data fetched from our database. Reply any excuses or replies if the user asks unrelevant questions"
 AI_ROLE_QUERY = "Your job is to convert the question to SQL query to access our database"
 
+class LLMBusy(Exception):
+    """Raised when LLM_MAX_PENDING chat completions are already waiting or running in this process."""
+
+class LLMTimeout(Exception):
+    """Raised when a chat completion did not answer within LLM_CALL_TIMEOUT seconds."""
+
+class LLMRunner:
+    """
+    Runs chat completions as coroutines with the async OpenAI client, on one event loop thread per
+    process. All calls share that thread and one HTTP connection pool; at most LLM_MAX_CONCURRENT
+    are in flight upstream and each gives up after LLM_CALL_TIMEOUT seconds. Request threads only
+    wait for the answer, and past LLM_MAX_PENDING outstanding calls new ones fail fast, so slow
+    model calls can never take every thread that CRUD requests need.
+    """
+
+    def __init__(self, max_concurrent=LLM_MAX_CONCURRENT, max_pending=LLM_MAX_PENDING):
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        # Created on the loop, which they belong to
+        self._client = None
+        self._upstream = None
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            # A forked worker inherits these attributes but not the thread, so every process starts its own loop
+            if self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='llm-loop', daemon=True)
+            thread.start()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            self._client = None
+
+    async def _complete(self, messages, temperature):
+        if self._client is None:
+            self._client = AsyncAzureOpenAI(
+                api_key=OPENAI_API_KEY,
+                azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                api_version=OPENAI_API_VERSION,
+                timeout=LLM_CALL_TIMEOUT,
+                max_retries=LLM_MAX_RETRIES,
+            )
+            self._upstream = asyncio.Semaphore(self.max_concurrent)
+
+        async with self._upstream:
+            completion = await self._client.chat.completions.create(
+                model=CHAT_COMPLETIONS_DEPLOYMENT_NAME,
+                messages=messages,
+                temperature=temperature,
+            )
+        return completion.choices[0].message.content
+
+    async def _complete_with_timeout(self, messages, temperature):
+        # Covers the wait for an upstream slot and any retries, not just one HTTP round trip
+        return await asyncio.wait_for(self._complete(messages, temperature), LLM_CALL_TIMEOUT)
+
+    def complete(self, messages, temperature):
+        """Run one chat completion on the event loop and return the message text."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise LLMBusy()
+        with self._lock:
+            self.pending += 1
+        try:
+            self._ensure_started()
+            future = asyncio.run_coroutine_threadsafe(self._complete_with_timeout(messages, temperature), self._loop)
+            try:
+                # The coroutine times itself out; this bound also holds if the loop itself is stuck
+                return future.result(timeout=LLM_CALL_TIMEOUT + 1)
+            except (asyncio.TimeoutError, FutureTimeoutError):
+                # Cancels the task on the loop, closing its HTTP request; stop() awaits whatever is left
+                future.cancel()
+                with self._lock:
+                    self.timed_out += 1
+                raise LLMTimeout()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+    async def _shutdown(self):
+        # Calls still on the loop, including ones whose request thread already gave up, are cancelled
+        # and awaited so none is left pending when the loop stops
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.close()
+
+    def stop(self):
+        """Cancel outstanding calls, close the HTTP client and stop this process's event loop."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            loop, thread = self._loop, self._thread
+            self._pid = None
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+        except FutureTimeoutError:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        if not thread.is_alive():
+            loop.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'call_timeout_seconds': LLM_CALL_TIMEOUT,
+            }
+
+llm_runner = LLMRunner()
+
 def generate_response(question, db_data):
     """
     This function sends a question and database data to the Azure OpenAI service and returns the response.
@@ -38,14 +169,9 @@ def generate_response(question, db_data):
         ]
         
         # Call the Azure OpenAI service
-        completion = client.chat.completions.create(
-            model=CHAT_COMPLETIONS_DEPLOYMENT_NAME,
-            messages=messages,
-            # max_tokens=159,
-            temperature=0.7
-        )
-        
-        return completion.choices[0].message.content
+        return llm_runner.complete(messages, temperature=0.7)
+    except (LLMBusy, LLMTimeout):
+        raise
     except Exception as e:
         # Check if the error is due to context length exceeding
         if 'context_length_exceeded' in str(e):
@@ -76,11 +202,8 @@ def generate_sql_query(question):
 
 
     try:
-        completion = client.chat.completions.create(
-            model=CHAT_COMPLETIONS_DEPLOYMENT_NAME,
-            messages=messages,
-            temperature=0.5  # Adjust temperature if needed
-        )
-        return completion.choices[0].message.content.strip()
+        return llm_runner.complete(messages, temperature=0.5).strip()  # Adjust temperature if needed
+    except (LLMBusy, LLMTimeout):
+        raise
     except Exception as e:
         return f"Error generating SQL query: {str(e)}"
\ No newline at end of file
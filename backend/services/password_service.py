@@ -0,0 +1,106 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+from db import get_db_connection
+from constants.config import BCRYPT_ROUNDS, PASSWORD_WORKERS, PASSWORD_MAX_PENDING
+
+class PasswordPoolBusy(Exception):
+    """Raised when PASSWORD_MAX_PENDING hash or verify calls are already waiting or running."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool. bcrypt releases the GIL, so request threads only
+    wait for the result, and at most PASSWORD_WORKERS hashes burn CPU at once however many logins
+    arrive together. Past PASSWORD_MAX_PENDING outstanding calls, new ones fail fast instead of queueing.
+    """
+
+    def __init__(self, max_workers=PASSWORD_WORKERS, max_pending=PASSWORD_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _timed(self, fn, submitted):
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def submit(self, fn):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy()
+        with self._lock:
+            self.pending += 1
+        return self._executor.submit(self._timed, fn, time.perf_counter())
+
+    def run(self, fn):
+        return self.submit(fn).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'queue_wait_avg_ms': round(self.wait_seconds_total / self.completed * 1000, 3) if self.completed else 0.0,
+                'queue_wait_max_ms': round(self.wait_seconds_max * 1000, 3),
+                'rounds': BCRYPT_ROUNDS,
+            }
+
+password_hasher = PasswordHasher()
+
+def hash_password(password):
+    return password_hasher.run(
+        lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('utf-8')
+    )
+
+def verify_password(password, hashed_password):
+    return password_hasher.run(
+        lambda: bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    )
+
+def needs_rehash(hashed_password):
+    """True when the hash was made with another work factor than BCRYPT_ROUNDS ('$2b$12$...')."""
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def rehash_in_background(eid, password, hashed_password):
+    """
+    Re-hash a just-verified password with the current work factor after the login has answered.
+    The stored hash is only replaced if nobody changed it in the meantime.
+    """
+    def rehash():
+        new_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)).decode('utf-8')
+        conn = get_db_connection()
+        try:
+            conn.execute('UPDATE users SET password = ? WHERE eid = ? AND password = ?', (new_hash, eid, hashed_password))
+            conn.commit()
+        finally:
+            conn.close()
+
+    try:
+        password_hasher.submit(rehash)
+    except PasswordPoolBusy:
+        # Try again at the next login
+        pass
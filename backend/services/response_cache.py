@@ -0,0 +1,111 @@
+import threading
+from functools import wraps
+from flask import request, make_response
+from cachetools import LRUCache
+
+from db import get_db
+from db.versions import get_data_version
+from constants.config import RESPONSE_CACHE_SIZE
+
+class _CountingLRUCache(LRUCache):
+    """LRUCache that counts the entries it drops to stay within maxsize."""
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.evictions = 0
+
+    def popitem(self):
+        self.evictions += 1
+        return super().popitem()
+
+class ResponseCache:
+    """
+    Rendered responses of read endpoints, keyed by endpoint, normalized parameters and Accept.
+
+    Write endpoints drop the entries of the tables they touch. Each entry also remembers the data
+    version it was rendered at, so writes from another worker or an ingest are never served stale.
+    """
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self._entries = _CountingLRUCache(maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, data_version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['data_version'] != data_version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+
+    def invalidate(self, tables):
+        tables = set(tables)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry['tables'] & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self._entries.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'maxsize': self._entries.maxsize,
+            }
+
+response_cache = ResponseCache()
+
+def _cache_key():
+    params = tuple(sorted((name, tuple(values)) for name, values in request.args.lists()))
+    view_args = tuple(sorted((request.view_args or {}).items()))
+    return request.endpoint, view_args, params, request.headers.get('Accept', '')
+
+def cached(*tables):
+    """Serve the view's 200 responses from the response cache until one of `tables` is written."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = _cache_key()
+            data_version = get_data_version(get_db(), tables)
+
+            entry = response_cache.get(key, data_version)
+            if entry is not None:
+                return make_response(entry['body'], 200, entry['headers'])
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, {
+                    'tables': set(tables),
+                    'data_version': data_version,
+                    'headers': [(name, value) for name, value in response.headers if name != 'Content-Length'],
+                    'body': response.get_data(),
+                })
+            return response
+        return wrapper
+    return decorator
+
+def invalidates(*tables):
+    """Drop the cached responses that read any of `tables` once the write view has run."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            finally:
+                response_cache.invalidate(tables)
+        return wrapper
+    return decorator
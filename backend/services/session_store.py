@@ -0,0 +1,194 @@
+import uuid
+import atexit
+import threading
+from datetime import datetime, timedelta
+from cachetools import TTLCache
+
+from db import get_db_connection
+from constants.config import (
+    SESSION_TTL_MINUTES, SESSION_CACHE_SIZE, SESSION_CACHE_TTL,
+    SESSION_FLUSH_INTERVAL, SESSION_SWEEP_INTERVAL, SESSION_SWEEP_BATCH,
+)
+
+def _now():
+    return datetime.utcnow()
+
+def _timestamp(value):
+    # Same text sqlite3 has always stored for these datetime columns, so old and new rows compare as strings
+    return value.isoformat(sep=' ')
+
+def is_expired(session):
+    return datetime.fromisoformat(session['expiration_date']) < _now()
+
+class SessionStore:
+    """
+    Sessions keyed by session_id, backed by the `sessions` table.
+
+    Lookups are served from a TTL cache, so a session check is a dict lookup rather than a query.
+    Touching a session only records last_accessed in memory; the sweeper thread writes those in one
+    batch every SESSION_FLUSH_INTERVAL seconds and deletes expired rows every SESSION_SWEEP_INTERVAL.
+    A session deleted by another worker can stay cached here for up to SESSION_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def create(self, conn, eid, role):
+        now = _now()
+        session = {
+            'session_id': str(uuid.uuid4()),
+            'eid': eid,
+            'role': role,
+            'created_at': _timestamp(now),
+            'expiration_date': _timestamp(now + timedelta(minutes=SESSION_TTL_MINUTES)),
+            'last_accessed': _timestamp(now),
+            'is_active': 1,
+        }
+        conn.execute(
+            'INSERT INTO sessions (session_id, eid, role, created_at, expiration_date, last_accessed, is_active) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            tuple(session.values()),
+        )
+        conn.commit()
+        with self._lock:
+            self._cache[session['session_id']] = session
+        return session
+
+    def get(self, conn, session_id):
+        """Return the session (possibly expired) or None, and record the access."""
+        with self._lock:
+            session = self._cache.get(session_id)
+
+        if session is None:
+            row = conn.execute('SELECT * FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+            if row is None:
+                return None
+            session = dict(row)
+            with self._lock:
+                self._cache[session_id] = session
+
+        if not is_expired(session):
+            self.touch(session_id)
+        return dict(session)
+
+    def touch(self, session_id):
+        now = _timestamp(_now())
+        with self._lock:
+            self._touched[session_id] = now
+            if session_id in self._cache:
+                self._cache[session_id]['last_accessed'] = now
+
+    def refresh(self, conn, session_id, eid=None, role=None):
+        """Extend a live session by SESSION_TTL_MINUTES. Returns the session, or None if it is gone or expired."""
+        session = self.get(conn, session_id)
+        if session is None or is_expired(session):
+            return None
+
+        now = _now()
+        session.update({
+            'eid': eid or session['eid'],
+            'role': role or session['role'],
+            'expiration_date': _timestamp(now + timedelta(minutes=SESSION_TTL_MINUTES)),
+            'last_accessed': _timestamp(now),
+            'is_active': 1,
+        })
+        conn.execute(
+            'UPDATE sessions SET eid = ?, role = ?, expiration_date = ?, last_accessed = ?, is_active = TRUE WHERE session_id = ?',
+            (session['eid'], session['role'], session['expiration_date'], session['last_accessed'], session_id),
+        )
+        conn.commit()
+        with self._lock:
+            self._cache[session_id] = session
+            self._touched.pop(session_id, None)
+        return dict(session)
+
+    def delete(self, conn, session_id):
+        with self._lock:
+            self._cache.pop(session_id, None)
+            self._touched.pop(session_id, None)
+        deleted = conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,)).rowcount
+        conn.commit()
+        return deleted > 0
+
+    def flush(self, conn=None):
+        """Write the buffered last_accessed times in one executemany. Returns how many sessions were written."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return 0
+
+        owns_connection = conn is None
+        if owns_connection:
+            conn = get_db_connection()
+        try:
+            conn.executemany(
+                'UPDATE sessions SET last_accessed = ? WHERE session_id = ?',
+                [(last_accessed, session_id) for session_id, last_accessed in touched.items()],
+            )
+            conn.commit()
+        finally:
+            if owns_connection:
+                conn.close()
+        return len(touched)
+
+    def sweep(self, conn=None):
+        """Delete expired sessions, SESSION_SWEEP_BATCH rows per transaction. Returns how many were deleted."""
+        owns_connection = conn is None
+        if owns_connection:
+            conn = get_db_connection()
+
+        now = _timestamp(_now())
+        deleted = 0
+        try:
+            while True:
+                # Short transactions so logins are never held up behind a large sweep
+                batch = conn.execute('''
+                    DELETE FROM sessions WHERE session_id IN (
+                        SELECT session_id FROM sessions WHERE expiration_date < ? LIMIT ?
+                    )
+                ''', (now, SESSION_SWEEP_BATCH)).rowcount
+                conn.commit()
+                deleted += batch
+                if batch < SESSION_SWEEP_BATCH:
+                    break
+        finally:
+            if owns_connection:
+                conn.close()
+
+        with self._lock:
+            for session_id in [session_id for session_id, session in self._cache.items() if is_expired(session)]:
+                del self._cache[session_id]
+        return deleted
+
+    def _run(self):
+        until_sweep = 0
+        while not self._stop.wait(SESSION_FLUSH_INTERVAL if until_sweep > 0 else 0):
+            try:
+                self.flush()
+                if until_sweep <= 0:
+                    deleted = self.sweep()
+                    if deleted:
+                        print(f"Session sweeper deleted {deleted} expired sessions")
+                    until_sweep = SESSION_SWEEP_INTERVAL
+                until_sweep -= SESSION_FLUSH_INTERVAL
+            except Exception as e:
+                print(f"Session sweeper error: {e}")
+
+    def start(self):
+        """Start the background flush and sweep thread once per process."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=SESSION_FLUSH_INTERVAL + 1)
+        self.flush()
+
+session_store = SessionStore()
@@ -0,0 +1,178 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from cachetools import LRUCache
+
+from db import get_db_connection
+from constants.config import SQL_CACHE_TTL_HOURS, SQL_CACHE_SIZE, SQL_CACHE_FLUSH_INTERVAL, CHAT_COMPLETIONS_DEPLOYMENT_NAME
+
+# Bookkeeping tables the generated SQL never reads; their DDL does not change what a question means
+_IGNORED_TABLES = ('sessions', 'jobs', 'schema_version', 'data_versions', 'sql_query_cache', 'revoked_tokens')
+
+def _now():
+    return datetime.utcnow().isoformat(timespec='seconds')
+
+def normalize_question(question):
+    """'  How many   employees? ' -> 'how many employees'"""
+    question = re.sub(r'\s+', ' ', (question or '').lower()).strip()
+    return question.rstrip('?!. ')
+
+def is_cacheable(sql_query):
+    # Failures to reach the model are retried next time; 'FAILED' (not an SQL question) is kept
+    return bool(sql_query) and not sql_query.startswith('Error generating SQL query')
+
+class SqlQueryCache:
+    """
+    SQL generated for a question, keyed by the normalized question and a fingerprint of the database
+    schema, so repeat questions skip the model entirely. An in-memory LRU sits in front of the
+    sql_query_cache table, which every worker shares and which survives restarts.
+
+    The fingerprint covers every table definition and the model deployment: any ALTER, new table or
+    ingest generation changes it, and entries made against the old schema are simply never looked
+    up again (they expire after SQL_CACHE_TTL_HOURS like the rest).
+
+    A hit is only counted in memory, so lookups never write; the counts are added to the table in one
+    batch at most every SQL_CACHE_FLUSH_INTERVAL seconds, and at shutdown.
+    """
+
+    def __init__(self, maxsize=SQL_CACHE_SIZE):
+        self._entries = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        # PRAGMA schema_version is bumped by SQLite on every schema change; only rehash when it moves
+        self._schema_version = None
+        self._fingerprint = None
+        # key -> [hits not yet written, last hit time]
+        self._pending_hits = {}
+        self._next_flush = time.monotonic() + SQL_CACHE_FLUSH_INTERVAL
+        self.hits = 0
+        self.misses = 0
+
+    def schema_fingerprint(self, conn):
+        schema_version = conn.execute('PRAGMA schema_version').fetchone()[0]
+        with self._lock:
+            if schema_version == self._schema_version:
+                return self._fingerprint
+
+        placeholders = ', '.join('?' for _ in _IGNORED_TABLES)
+        rows = conn.execute(f'''
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT IN ({placeholders})
+            ORDER BY name
+        ''', _IGNORED_TABLES).fetchall()
+        digest = hashlib.sha1((CHAT_COMPLETIONS_DEPLOYMENT_NAME or '').encode('utf-8'))
+        for name, sql in rows:
+            digest.update(b'\0')
+            digest.update(f"{name}\0{sql}".encode('utf-8'))
+        fingerprint = digest.hexdigest()
+
+        with self._lock:
+            self._schema_version, self._fingerprint = schema_version, fingerprint
+        return fingerprint
+
+    def get(self, conn, question):
+        """The cached SQL for the question under the current schema, or None."""
+        key = (normalize_question(question), self.schema_fingerprint(conn))
+        now = _now()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            row = conn.execute(
+                'SELECT sql_query, expires_at FROM sql_query_cache WHERE question = ? AND schema_fingerprint = ?',
+                key,
+            ).fetchone()
+            entry = dict(row) if row else None
+
+        if entry is None or entry['expires_at'] <= now:
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._entries[key] = entry
+            self.hits += 1
+            pending = self._pending_hits.setdefault(key, [0, now])
+            pending[0] += 1
+            pending[1] = now
+            # Claimed under the lock, so only one request per interval does the write
+            flush_due = time.monotonic() >= self._next_flush
+            if flush_due:
+                self._next_flush = time.monotonic() + SQL_CACHE_FLUSH_INTERVAL
+        if flush_due:
+            self.flush(conn)
+        return entry['sql_query']
+
+    def flush(self, conn=None):
+        """Add the hit counts gathered in memory to the table in one executemany. Returns how many entries were written."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return 0
+
+        owns_connection = conn is None
+        if owns_connection:
+            conn = get_db_connection()
+        try:
+            conn.executemany(
+                'UPDATE sql_query_cache SET hits = hits + ?, last_hit_at = ? WHERE question = ? AND schema_fingerprint = ?',
+                [(count, last_hit_at) + key for key, (count, last_hit_at) in pending.items()],
+            )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # e.g. an ingest holds the write lock; keep the counts for the next flush
+            conn.rollback()
+            with self._lock:
+                for key, (count, last_hit_at) in pending.items():
+                    self._pending_hits.setdefault(key, [0, last_hit_at])[0] += count
+            print(f"Could not write SQL cache hits: {e}")
+            return 0
+        finally:
+            if owns_connection:
+                conn.close()
+        return len(pending)
+
+    def put(self, conn, question, sql_query):
+        if not is_cacheable(sql_query):
+            return
+        key = (normalize_question(question), self.schema_fingerprint(conn))
+        now = datetime.utcnow()
+        entry = {
+            'sql_query': sql_query,
+            'expires_at': (now + timedelta(hours=SQL_CACHE_TTL_HOURS)).isoformat(timespec='seconds'),
+        }
+
+        # Expired rows and rows of older schemas are dropped as new ones come in
+        conn.execute('DELETE FROM sql_query_cache WHERE expires_at <= ?', (now.isoformat(timespec='seconds'),))
+        conn.execute('''
+            INSERT OR REPLACE INTO sql_query_cache (question, schema_fingerprint, sql_query, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', key + (sql_query, now.isoformat(timespec='seconds'), entry['expires_at']))
+        conn.commit()
+        with self._lock:
+            self._entries[key] = entry
+
+    def discard(self, conn, question):
+        """Forget the question's SQL, e.g. because it failed to run."""
+        key = (normalize_question(question), self.schema_fingerprint(conn))
+        with self._lock:
+            self._entries.pop(key, None)
+        conn.execute('DELETE FROM sql_query_cache WHERE question = ? AND schema_fingerprint = ?', key)
+        conn.commit()
+
+    def stats(self, conn):
+        row = conn.execute('SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS stored_hits FROM sql_query_cache').fetchone()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'unwritten_hits': sum(count for count, _ in self._pending_hits.values()),
+                'misses': self.misses,
+                'memory_size': len(self._entries),
+                'entries': row['entries'],
+                'stored_hits': row['stored_hits'],
+            }
+
+sql_query_cache = SqlQueryCache()
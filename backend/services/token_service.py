@@ -0,0 +1,114 @@
+import os
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+import jwt
+
+from db import get_db_connection
+from constants.config import JWT_ALGORITHM, JWT_TTL_MINUTES, TOKEN_REVOCATION_POLL_SECONDS
+
+_secret = None
+_secret_lock = threading.Lock()
+
+def _signing_key():
+    # Read on first use: server.py loads .env after the modules are imported
+    global _secret
+    with _secret_lock:
+        if _secret is None:
+            _secret = os.getenv("SECRET_KEY")
+            if not _secret:
+                # A made-up key would differ per worker process and from the frontend's copy
+                raise RuntimeError("SECRET_KEY is not set; it signs the login tokens and must be shared by every worker and the frontend")
+        return _secret
+
+class RevocationList:
+    """
+    Token ids (jti) revoked before they expire, e.g. at logout, backed by the revoked_tokens table.
+    A revocation is written to the table and kept in memory; every worker process picks up the
+    others' rows by polling for ids past the last one it has seen, at most once every
+    TOKEN_REVOCATION_POLL_SECONDS, so a token logged out in one worker is refused by all of them
+    within that window. Entries are pruned as the tokens expire.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._last_id = 0
+        self._next_poll = 0
+        self._lock = threading.Lock()
+
+    def revoke(self, conn, jti, expires_at):
+        now = datetime.now(timezone.utc).timestamp()
+        conn.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (now,))
+        conn.execute('INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)', (jti, expires_at))
+        conn.commit()
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def poll(self, conn=None):
+        """Load revocations other workers have written since the last poll."""
+        owns_connection = conn is None
+        if owns_connection:
+            conn = get_db_connection()
+        try:
+            with self._lock:
+                last_id = self._last_id
+            rows = conn.execute(
+                'SELECT id, jti, expires_at FROM revoked_tokens WHERE id > ? ORDER BY id', (last_id,)
+            ).fetchall()
+        finally:
+            if owns_connection:
+                conn.close()
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._revoked[jti] = expires_at
+                self._last_id = max(self._last_id, row_id)
+
+    def is_revoked(self, jti):
+        now = time.monotonic()
+        with self._lock:
+            due = now >= self._next_poll
+            if due:
+                # Claimed under the lock, so only one request thread per interval runs the query
+                self._next_poll = now + TOKEN_REVOCATION_POLL_SECONDS
+        if due:
+            try:
+                self.poll()
+            except sqlite3.Error as e:
+                # Keep answering from what is known; the next interval tries again
+                print(f"Could not load revoked tokens: {e}")
+        with self._lock:
+            return jti in self._revoked
+
+    def prune(self, now=None):
+        now = now or datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at < now]:
+                del self._revoked[jti]
+
+revocation_list = RevocationList()
+
+def issue_token(eid, role):
+    """Sign a token for the user. Returns (token, claims)."""
+    now = datetime.now(timezone.utc)
+    claims = {
+        'sub': eid,
+        'role': role,
+        'iat': now,
+        'exp': now + timedelta(minutes=JWT_TTL_MINUTES),
+        'jti': uuid.uuid4().hex,
+    }
+    return jwt.encode(claims, _signing_key(), algorithm=JWT_ALGORITHM), claims
+
+def decode_token(token):
+    """Verify signature, expiry and revocation. Raises jwt.InvalidTokenError when the token is not valid."""
+    claims = jwt.decode(token, _signing_key(), algorithms=[JWT_ALGORITHM], options={'require': ['sub', 'exp', 'jti']})
+    if revocation_list.is_revoked(claims['jti']):
+        raise jwt.InvalidTokenError('Token has been revoked')
+    return claims
+
+def revoke_token(conn, claims):
+    """Refuse the token from now on, in every worker (see RevocationList)."""
+    revocation_list.prune()
+    revocation_list.revoke(conn, claims['jti'], claims['exp'])
@@ -0,0 +1,40 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The backend resolves its paths against the working directory and reads its settings at import,
+# so point both at a scratch copy of the database before anything from it is imported
+_workdir = tempfile.mkdtemp(prefix='backend-tests-')
+os.makedirs(os.path.join(_workdir, 'data', 'output'))
+shutil.copy(
+    os.path.join(BACKEND_DIR, 'data', 'output', 'project_database.db'),
+    os.path.join(_workdir, 'data', 'output', 'project_database.db'),
+)
+os.chdir(_workdir)
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-0123456789abcdef0123456789')
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+os.environ.setdefault('INGEST_CHUNK_SIZE', '2')
+os.environ.setdefault('AZURE_OPENAI_ENDPOINT', 'http://127.0.0.1:9')
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('OPENAI_API_VERSION', '2024-02-01')
+
+@pytest.fixture(scope='session')
+def app():
+    from server import create_app
+    return create_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope='session', autouse=True)
+def _cleanup_workdir():
+    yield
+    shutil.rmtree(_workdir, ignore_errors=True)
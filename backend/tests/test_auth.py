@@ -0,0 +1,103 @@
+import pytest
+
+from db import get_db_connection
+from services.token_service import issue_token
+from services.password_service import hash_password
+
+def _headers(role):
+    token, _ = issue_token(f'test.{role.lower()}', role)
+    return {'Authorization': f'Bearer {token}'}
+
+# (method, path, json body) of the endpoints only admins may call
+ADMIN_ENDPOINTS = [
+    ('POST', '/api/ingest/upload_csv', None),
+    ('POST', '/api/ingest/rollback', {'table_name': 'events'}),
+    ('POST', '/api/employees/certifications/batch', {'operations': []}),
+    ('DELETE', '/api/cache', None),
+    ('POST', '/api/jobs/ingest', None),
+    ('POST', '/api/jobs', {'kind': 'analytics', 'params': {'script': 'prompt_engineer_OverallCompletion'}}),
+]
+
+# Admins and project managers review submitted certifications
+REVIEW_ENDPOINTS = [
+    ('POST', '/review-certifications', {'employees_cert_ids': [], 'decision': 'approve'}),
+    ('POST', '/approve-certification', {'employees_cert_id': 'x'}),
+]
+
+def _call(client, method, path, body, headers):
+    return client.open(path, method=method, json=body, headers=headers)
+
+@pytest.mark.parametrize('method, path, body', ADMIN_ENDPOINTS + REVIEW_ENDPOINTS)
+def test_employee_token_is_forbidden(client, method, path, body):
+    response = _call(client, method, path, body, _headers('EMPLOYEE'))
+    assert response.status_code == 403
+
+@pytest.mark.parametrize('method, path, body', ADMIN_ENDPOINTS)
+def test_manager_token_is_forbidden_on_admin_endpoints(client, method, path, body):
+    response = _call(client, method, path, body, _headers('MANAGER'))
+    assert response.status_code == 403
+
+@pytest.mark.parametrize('method, path, body', REVIEW_ENDPOINTS)
+def test_manager_token_may_review(client, method, path, body):
+    response = _call(client, method, path, body, _headers('MANAGER'))
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('method, path, body', REVIEW_ENDPOINTS)
+def test_enum_value_is_not_a_role(client, method, path, body):
+    # Role.MANAGER.value; no user is ever stored or issued a token with it
+    response = _call(client, method, path, body, _headers('PROJECT_MANAGER'))
+    assert response.status_code == 403
+
+@pytest.mark.parametrize('method, path, body', ADMIN_ENDPOINTS + REVIEW_ENDPOINTS)
+def test_missing_token_is_unauthorized(client, method, path, body):
+    response = _call(client, method, path, body, {})
+    assert response.status_code == 401
+
+def test_admin_token_is_allowed(client):
+    response = client.delete('/api/cache', headers=_headers('ADMIN'))
+    assert response.status_code == 200
+
+@pytest.fixture
+def manager_login(client):
+    # test.manager is seeded with role MANAGER; give it a known password in the scratch database
+    conn = get_db_connection()
+    conn.execute('UPDATE users SET password = ? WHERE eid = ?', (hash_password('manager-pass'), 'test.manager'))
+    conn.commit()
+    conn.close()
+    response = client.post('/api/auth/login', json={'username': 'test.manager', 'password': 'manager-pass'})
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_seeded_manager_may_review(client, manager_login):
+    assert manager_login['role'] == 'MANAGER'
+    headers = {'Authorization': f"Bearer {manager_login['token']}"}
+    for method, path, body in REVIEW_ENDPOINTS:
+        assert _call(client, method, path, body, headers).status_code == 400
+    for method, path, body in ADMIN_ENDPOINTS:
+        assert _call(client, method, path, body, headers).status_code == 403
+
+def test_app_refuses_to_start_without_secret_key(monkeypatch):
+    import server
+    monkeypatch.setattr(server, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError):
+        server.create_app()
+
+def test_logout_in_one_worker_revokes_the_token_in_all(client):
+    from services.token_service import RevocationList, revocation_list
+    token, claims = issue_token('test.admin', 'ADMIN')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Another worker process has its own list and logs the token out there
+    other_worker = RevocationList()
+    conn = get_db_connection()
+    other_worker.revoke(conn, claims['jti'], claims['exp'].timestamp())
+    conn.close()
+
+    # This worker picks the revocation up at its next poll
+    revocation_list._next_poll = 0
+    assert client.delete('/api/cache', headers=headers).status_code == 401
+
+def test_logout_revokes_the_token(client):
+    headers = _headers('ADMIN')
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert client.delete('/api/cache', headers=headers).status_code == 401
@@ -0,0 +1,24 @@
+from db import get_db_connection
+from services.certifications_service import apply_certification_batch
+
+def test_inserts_report_their_own_ids(app):
+    conn = get_db_connection()
+    items = [
+        {'op': 'insert', 'fields': {'EID': 'batch.one', 'TARGET_CERTIFICATION': 'AZ-900'}},
+        {'op': 'insert', 'fields': {'EID': 'batch.two', 'TARGET_CERTIFICATION': 'AZ-104'}},
+    ]
+    results, applied = apply_certification_batch(conn, items)
+
+    assert applied == 2
+    for result, item in zip(results, items):
+        row = conn.execute('SELECT EID FROM employees_certs WHERE employees_cert_id = ?', (result['id'],)).fetchone()
+        assert row['EID'] == item['fields']['EID']
+    conn.close()
+
+def test_booleans_are_not_ids(app):
+    conn = get_db_connection()
+    results, applied = apply_certification_batch(conn, [{'op': 'delete', 'id': True}, {'op': 'patch', 'id': False, 'fields': {'EID': 'x'}}])
+
+    assert applied == 0
+    assert [result['error'] for result in results] == ['An integer id is required'] * 2
+    conn.close()
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from db import get_db_connection
+from services.ingest_data_service import create_table_from_csv
+from services.job_service import job_runner, get_job, job_file_path, new_job_id, SUCCEEDED, FAILED, CANCELLED
+
+TABLE = 'job_test_rows'
+
+def _write_csv(job_id, lines):
+    path = job_file_path(job_id, '.csv')
+    with open(path, 'w') as csv_file:
+        csv_file.write('\n'.join(lines) + '\n')
+    return path
+
+def _run_ingest(operation, lines, key_columns=None):
+    job_id = new_job_id()
+    job_runner.submit('ingest_csv', {
+        'file_path': _write_csv(job_id, lines),
+        'table_name': TABLE,
+        'operation': operation,
+        'key_columns': key_columns or [],
+    }, job_id=job_id)
+
+    conn = get_db_connection()
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            job = get_job(conn, job_id)
+            if job['status'] in (SUCCEEDED, FAILED, CANCELLED):
+                return job
+            time.sleep(0.05)
+    finally:
+        conn.close()
+    pytest.fail(f"{operation} job did not finish")
+
+@pytest.fixture
+def table(app):
+    # Several chunks per load (INGEST_CHUNK_SIZE=2), so the job reports progress while the loader writes
+    with open(job_file_path('seed', '.csv'), 'wb') as seed:
+        seed.write(b'name,value\n' + b''.join(f'row{i},{i}\n'.encode() for i in range(6)))
+    with open(job_file_path('seed', '.csv'), 'rb') as seed:
+        create_table_from_csv(seed, TABLE)
+    return TABLE
+
+def _rows(table_name):
+    conn = get_db_connection()
+    try:
+        return dict(conn.execute(f'SELECT name, value FROM {table_name}').fetchall())
+    finally:
+        conn.close()
+
+def test_add_rows_job_runs_to_completion(table):
+    job = _run_ingest('Add Rows to Existing Table', ['name,value'] + [f'added{i},{i}' for i in range(7)])
+
+    assert job['status'] == SUCCEEDED, job['error']
+    assert job['progress'] == 100
+    assert job['result']['rows'] == 7
+    assert len(_rows(table)) == 13
+
+def test_merge_job_runs_to_completion(table):
+    job = _run_ingest('Merge', ['name,value', 'row0,0', 'row1,changed', 'new0,a', 'new1,b', 'new2,c'], key_columns=['name'])
+
+    assert job['status'] == SUCCEEDED, job['error']
+    assert job['progress'] == 100
+    assert job['result']['changed'] == 4
+    rows = _rows(table)
+    assert rows['row1'] == 'changed'
+    assert rows['new2'] == 'c'
+    assert len(rows) == 9
+
+def test_cancel_while_another_worker_holds_the_lock_is_retryable(client, monkeypatch):
+    import sqlite3
+    import api.jobs_api as jobs_api
+    from services.token_service import issue_token
+
+    job_id = new_job_id()
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO jobs (job_id, kind, status, params, created_at) VALUES (?, 'certifications_export', 'running', '{}', '2026-01-01T00:00:00')",
+        (job_id,),
+    )
+    conn.commit()
+    conn.close()
+
+    def locked(conn, job_id):
+        raise sqlite3.OperationalError('database is locked')
+    monkeypatch.setattr(jobs_api.job_runner, 'cancel', locked)
+
+    token, _ = issue_token('test.admin', 'ADMIN')
+    response = client.post(f'/api/jobs/{job_id}/cancel', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
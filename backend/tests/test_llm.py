@@ -0,0 +1,71 @@
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import services.llm_service as llm_service
+from services.llm_service import LLMRunner, LLMTimeout
+
+class _SlowCompletions(BaseHTTPRequestHandler):
+    """Stands in for the Azure OpenAI chat completions endpoint, answering after `delay` seconds."""
+    delay = 2.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(self.delay)
+        body = json.dumps({
+            'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'FAILED'}}],
+        }).encode('utf-8')
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client gave up first
+            pass
+
+@pytest.fixture
+def runner(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(llm_service, 'AZURE_OPENAI_ENDPOINT', f'http://127.0.0.1:{server.server_address[1]}')
+    monkeypatch.setattr(llm_service, 'LLM_CALL_TIMEOUT', 0.3)
+    monkeypatch.setattr(llm_service, 'LLM_MAX_RETRIES', 0)
+    runner = LLMRunner()
+    monkeypatch.setattr(llm_service, 'llm_runner', runner)
+    yield runner
+    runner.stop()
+    server.shutdown()
+
+def test_slow_model_answers_504(client, runner):
+    started = time.monotonic()
+    response = client.post('/api/llm_query', json={'question': 'how many employees?'})
+
+    assert response.status_code == 504
+    assert time.monotonic() - started < 1.5
+    assert runner.stats()['timed_out'] == 1
+    assert runner.stats()['pending'] == 0
+
+def test_stuck_event_loop_still_times_out(runner):
+    runner._ensure_started()
+    runner._loop.call_soon_threadsafe(time.sleep, 3)
+
+    started = time.monotonic()
+    with pytest.raises(LLMTimeout):
+        runner.complete([{'role': 'user', 'content': 'hi'}], temperature=0)
+    assert time.monotonic() - started < 2
+
+def test_app_refuses_to_start_when_llm_calls_could_take_every_thread(monkeypatch):
+    import server
+    monkeypatch.setattr(server, 'WEB_THREADS', server.llm_runner.max_pending)
+    with pytest.raises(RuntimeError):
+        server.create_app()
@@ -0,0 +1,27 @@
+from db import get_db_connection
+from services.sql_cache_service import SqlQueryCache
+
+def _stored_hits(conn, question):
+    row = conn.execute('SELECT hits FROM sql_query_cache WHERE question = ?', (question,)).fetchone()
+    return row['hits']
+
+def test_hits_are_written_in_one_batch(app):
+    cache = SqlQueryCache()
+    conn = get_db_connection()
+    cache.put(conn, 'How many employees?', 'SELECT COUNT(*) FROM employees_certs')
+
+    # Another connection holds the write lock: lookups must not need it
+    writer = get_db_connection()
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        for _ in range(3):
+            assert cache.get(conn, 'how many  employees') == 'SELECT COUNT(*) FROM employees_certs'
+    finally:
+        writer.rollback()
+        writer.close()
+
+    assert _stored_hits(conn, 'how many employees') == 0
+    assert cache.flush(conn) == 1
+    assert _stored_hits(conn, 'how many employees') == 3
+    assert cache.stats(conn)['unwritten_hits'] == 0
+    conn.close()
@@ -3,15 +3,14 @@ import time
 import os
 
 from dotenv import load_dotenv
-from services.auth_service import authenticate_user
-from services.session_service import create_or_update_session, fetch_session, delete_session, cleanup_sessions
+from services.auth_service import authenticate_user, validate_token, logout_user
+from services.session_service import create_or_update_session, delete_session, cleanup_sessions
 
 from constants.config import APP_NAME
 from constants.persona import ADMIN, PROJECT_MANAGER, EMPLOYEE
 from constants.theme import BG_COLOR, PRIM_COLOR, COLOR_A, COLOR_B, TEXT_COLOR
 from constants.path import ADMIN_PATH, EMPLOYEE_PATH, MANAGER_PATH
 from constants.assets import LOGO
-from datetime import datetime
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -30,9 +29,10 @@ def admin_poc_pages():
     certifications = st.Page("pages/certifications.py", title="Certifications", icon="📜")
     ai_assistant = st.Page("pages/ai_assistant.py", title="CertiGuide", icon="🤖")
     ingest_data = st.Page(f"{ADMIN_PATH}/ingest_data.py", title="Ingest CSV Data", icon="💉")
+    jobs = st.Page(f"{ADMIN_PATH}/jobs.py", title="Background Jobs", icon="⚙️")
     profile = st.Page(f"pages/profile.py", title="Profile", icon="👤")
 
-    return [dashboard, employee, certifications, ai_assistant, ingest_data, profile]
+    return [dashboard, employee, certifications, ai_assistant, ingest_data, jobs, profile]
 
 
 def manager_pages():
@@ -92,6 +92,7 @@ def show_login_form():
             st.session_state.logged_in = True
             st.session_state.persona = persona
             st.session_state.EID = username
+            st.session_state.token = response.get("token")
 
             # Create a session
             session_response, session_success = create_or_update_session(persona, st.session_state.EID)
@@ -111,7 +112,10 @@ def show_login_form():
 
 def logout():
     # Clear session state
-    delete_session()
+    if st.session_state.get('token'):
+        logout_user()
+    if st.session_state.get('session_id'):
+        delete_session(st.session_state.session_id)
     for key in list(st.session_state.keys()):
         del st.session_state[key]
     
@@ -151,9 +155,16 @@ def redirect_dashboard(persona):
         
 
 def check_session():
-    session_response, session_success = fetch_session()
-    if session_success:
-        cleanup_expired_sessions(session_response)
+    # The login token is validated locally, so reruns do not cost a request to the server
+    token = st.session_state.get('token')
+    claims = validate_token(token) if token else None
+    if claims:
+        st.session_state.logged_in = True
+        st.session_state.persona = claims['role']
+        st.session_state.EID = claims['sub']
+    elif token:
+        st.warning("Session expired. Please log in again.")
+        logout()
     else:
         st.session_state.logged_in = False
         st.session_state.persona = None
@@ -171,19 +182,10 @@ def init_states():
         st.session_state.EID = None
     if 'session_id' not in st.session_state:
         st.session_state.session_id = None
+    if 'token' not in st.session_state:
+        st.session_state.token = None
 
 
-def cleanup_expired_sessions(session_response):
-    expiration_date = datetime.fromisoformat(session_response.get("expiration_date"))
-    if expiration_date < datetime.utcnow():
-        st.warning("Session expired. Please log in again.")
-        logout()
-    else:
-        st.session_state.logged_in = True
-        st.session_state.persona = session_response.get('role')
-        st.session_state.EID = session_response.get('eid')
-        st.session_state.session_id = session_response.get('session_id')
-
 # **********************************************************************************************************************************************
 
     #? MAIN FUNCTION
@@ -5,3 +5,27 @@ RANKING_ORDER = {
     'Professional/Specialty': 3,
     'Expert': 4,
 }
+
+# Certification filter query parameters (see /api/employees/certifications/page) and the column each one filters
+CERTIFICATION_FILTER_COLUMNS = {
+    'eid': 'EID',
+    'certification': 'TARGET_CERTIFICATION',
+    'status': 'EMPLOYEE_STATUS',
+    'progress': 'CURRENT_PROGRESS',
+    'management_level': 'MANAGEMENT_LEVEL',
+    'capability': 'CAPABILITY',
+    'level': 'Certification_Level',
+    'fiscal_year': 'Fiscal_Year',
+    'quarter': 'Quarter',
+    'month': 'Month',
+    'project': 'PROJECT_NAME',
+    'manager': 'MANAGER_EID',
+}
+
+# employees_certs columns the admin grid can edit, as accepted by /api/employees/certifications/batch
+CERTIFICATION_EDITABLE_FIELDS = [
+    'FIRST_NAME', 'LAST_NAME', 'EID', 'EMPLOYEE_ID', 'MANAGER_EID', 'MANAGEMENT_LEVEL',
+    'CAPABILITY', 'EMPLOYEE_STATUS', 'WITH_VOUCHER', 'CURRENT_PROGRESS',
+    'TARGET_CERTIFICATION', '1ST_TARGET_CERTIFICATION_DATE', 'RETAKE_EXAM_DATE',
+    'EXPIRATION_DATE', 'FISCAL_YEAR', 'QUARTER', 'MONTH', 'PROJECT_NAME'
+]
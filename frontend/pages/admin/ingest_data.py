@@ -1,22 +1,46 @@
 import streamlit as st
-from services.ingest_data_service import upload_csv
+from services.ingest_data_service import upload_csv, rollback_table
+from services.jobs_service import submit_ingest_job
 
 def ingest_data():
     st.title("Ingest CSV to the Database")
 
     st.subheader("Upload CSV File")
     table_name = st.text_input("Table Name")
-    operation = st.radio("Operation", options=["Create New Table", "Add Rows to Existing Table"])
+    operation = st.radio("Operation", options=["Create New Table", "Add Rows to Existing Table", "Merge"])
+
+    key_columns = None
+    if operation == "Merge":
+        key_input = st.text_input(
+            "Key Columns",
+            placeholder="e.g. EID, TARGET_CERTIFICATION",
+            help="Columns that identify a row. Leave empty to use the table's default key.",
+        )
+        key_columns = [column.strip() for column in key_input.split(',') if column.strip()]
+
     file = st.file_uploader("Choose a CSV file", type="csv")
+    in_background = st.checkbox("Run in background", help="Large files load as a job; follow it on the Background Jobs page.")
 
     if st.button("Upload CSV"):
-        if file and table_name:
+        if file and table_name and in_background:
+            job = submit_ingest_job(file, table_name, operation, key_columns)
+            if job:
+                st.success(f"Upload queued as job {job['job_id'][:8]}. Follow its progress on the Background Jobs page.")
+        elif file and table_name:
             try:
-                upload_csv(file, table_name, operation)
+                upload_csv(file, table_name, operation, key_columns)
                 st.success(f"Operation '{operation}' was successful on table '{table_name}'.")
             except ValueError as e:
                 st.error(f"Error: {e}")
         else:
             st.warning("Please provide a table name and select a CSV file.")
 
+    st.subheader("Roll Back")
+    st.caption("\"Create New Table\" keeps the table it replaces. Rolling back swaps that previous version back in.")
+    if st.button("Roll Back to Previous Version"):
+        if table_name:
+            rollback_table(table_name)
+        else:
+            st.warning("Please provide a table name.")
+
 ingest_data()
@@ -0,0 +1,76 @@
+import streamlit as st
+from services.jobs_service import submit_job, fetch_jobs, cancel_job, fetch_job_result
+
+ANALYTICS_SCRIPTS = {
+    'Certifications with the most passers': 'prompt_engineer_Cert_HiNum_Employees',
+    'Monthly trend of certified employees': 'prompt_engineer_Monthly_Trend_Cert_Empl',
+    'Overall completion rates': 'prompt_engineer_OverallCompletion',
+    'Trained employees per project': 'prompt_engineer_TrainedEmployees',
+}
+
+STATUS_ICONS = {'queued': '🕒', 'running': '⏳', 'succeeded': '✅', 'failed': '❌', 'cancelled': '🚫'}
+
+def start_jobs():
+    st.subheader("Start a Job")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        analytics = st.selectbox("Analytics", options=list(ANALYTICS_SCRIPTS))
+        if st.button("Run Analytics"):
+            if submit_job('analytics', {'script': ANALYTICS_SCRIPTS[analytics]}):
+                st.success("Analytics job queued.")
+
+    with col2:
+        export_format = st.selectbox("Export Format", options=['csv', 'ndjson'])
+        if st.button("Export All Certifications"):
+            if submit_job('certifications_export', {'export_format': export_format}):
+                st.success("Export job queued.")
+
+def show_job(job):
+    icon = STATUS_ICONS.get(job['status'], '')
+    st.markdown(f"**{icon} {job['kind']}** · `{job['job_id'][:8]}` · {job['status']} · created {job['created_at']}")
+
+    if job['status'] in ('queued', 'running'):
+        st.progress(int(job['progress']), text=job.get('message') or '')
+        if st.button("Cancel", key=f"cancel_{job['job_id']}", disabled=job['cancel_requested']):
+            cancel_job(job['job_id'])
+    elif job['status'] == 'succeeded':
+        st.caption(f"Finished in {job['duration_seconds']}s")
+        result = job['result'] or {}
+        # Keep the fetched file in session state so the periodic refresh does not drop the download button.
+        # Only the latest one: preparing another download replaces it
+        download = st.session_state.get('job_download')
+        prepared = download is not None and download[0] == job['job_id']
+        if result.get('path') and not prepared:
+            if st.button("Prepare Download", key=f"prepare_{job['job_id']}"):
+                content = fetch_job_result(job['job_id'])
+                if content is not None:
+                    st.session_state['job_download'] = download = (job['job_id'], content)
+                    prepared = True
+        if prepared:
+            st.download_button(
+                "📥 Download",
+                data=download[1],
+                file_name=f"certifications.{result.get('format', 'csv')}",
+                key=f"download_{job['job_id']}",
+            )
+    elif job['status'] == 'failed':
+        st.error(job['error'])
+
+# Re-render only this section every few seconds while the page is open
+@st.fragment(run_every=3)
+def job_list():
+    st.subheader("Recent Jobs")
+    jobs = fetch_jobs()
+    if not jobs:
+        st.info("No jobs yet.")
+    for job in jobs:
+        with st.container(border=True):
+            show_job(job)
+
+def jobs():
+    st.title("Background Jobs")
+    start_jobs()
+    job_list()
+
+jobs()
@@ -7,37 +7,41 @@ import plotly.express as px
 import time
 
 from datetime import datetime
-from services.employee_service import fetch_certifications, fetch_certificates, add_certification as add_cert, send_certification_data
+from services.employee_service import fetch_certificates, add_certification as add_cert, send_certification_data
+from services.employee_service import fetch_certifications_page, fetch_certification_filter_options, fetch_certification_counts, export_certifications
 from constants.persona import ADMIN, PROJECT_MANAGER
+from constants.certificates import CERTIFICATION_FILTER_COLUMNS, CERTIFICATION_EDITABLE_FIELDS
 from constants.theme import PRIM_COLOR, BG_COLOR
-from services.employee_service import update_certification, delete_certification, fetch_pending_certifications, approve_certification
+from services.employee_service import update_certification, delete_certification, fetch_pending_certifications
+from services.employee_service import apply_certification_batch, review_certifications
 
-from io import BytesIO
+def generate_csv_download_link(filters, filename_prefix):
+    """Export the filtered certifications on demand and offer the CSV with the current date and time."""
+    if not st.button("📥 Export CSV"):
+        return
 
-def generate_csv_download_link(df, filename_prefix):
-    """Generate a download link for a CSV file with the current date and time."""
-    current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"{filename_prefix}_{current_time}.csv"
-    csv_buffer = BytesIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_buffer.seek(0)
-    
-    st.download_button(
-        label="📥 Download CSV",
-        data=csv_buffer,
-        file_name=filename,
-        mime="text/csv"
-    )
+    with st.spinner("Exporting certifications..."):
+        export_file = export_certifications(filters, 'csv')
+
+    if export_file is not None:
+        current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        filename = f"{filename_prefix}_{current_time}.csv"
+
+        st.download_button(
+            label="📥 Download CSV",
+            data=export_file,
+            file_name=filename,
+            mime="text/csv"
+        )
 
 def truncate_string(s, max_length):
     if len(s) > max_length:
         return s[:max_length - 3] + '...'  # Subtract 3 to account for the length of '...'
     return s
 
-def plot_certifications_by_level(df):
+def plot_certifications_by_level(level_counts):
     st.subheader("Certifications by Level 🏆")
 
-    level_counts = df['Certification_Level'].value_counts()
     fig, ax = plt.subplots()
     sns.barplot(x=level_counts.index, y=level_counts.values, ax=ax, palette="viridis", hue=level_counts.index, legend=False)
     ax.set_xlabel("Certification Level", fontsize=10)
@@ -47,10 +51,9 @@ def plot_certifications_by_level(df):
     ax.tick_params(axis='y', labelsize=8)
     st.pyplot(fig)
 
-def plot_progress_distribution(df):
+def plot_progress_distribution(progress_counts):
     st.subheader("Progress Distribution 📈")
 
-    progress_counts = df['CURRENT_PROGRESS'].value_counts()
     fig, ax = plt.subplots()
     sns.barplot(x=progress_counts.index, y=progress_counts.values, ax=ax, palette="coolwarm", hue=progress_counts.index, legend=False)
     ax.set_xlabel("Current Progress", fontsize=10)
@@ -60,11 +63,11 @@ def plot_progress_distribution(df):
     ax.tick_params(axis='y', labelsize=8)
     st.pyplot(fig)
 
-def plot_certifications_by_project(df):
+def plot_certifications_by_project(project_counts):
     st.subheader("Certifications by Project 🗂️")
 
-    # Calculate the count of certifications by project
-    project_counts = df['PROJECT_NAME'].value_counts().reset_index()
+    # Turn the server-side counts into a two-column DataFrame
+    project_counts = project_counts.reset_index()
     project_counts.columns = ['Project Name', 'Count']
 
     # Create an interactive bar plot using Plotly
@@ -88,11 +91,11 @@ def plot_certifications_by_project(df):
 
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_certifications_by_manager(df):
+def plot_certifications_by_manager(manager_counts):
     st.subheader("Certifications by Manager 👨‍💼")
 
-    # Calculate the count of certifications by manager
-    manager_counts = df['MANAGER_EID'].value_counts().reset_index()
+    # Turn the server-side counts into a two-column DataFrame
+    manager_counts = manager_counts.reset_index()
     manager_counts.columns = ['Manager EID', 'Count']
 
     # Create an interactive bar plot using Plotly
@@ -116,10 +119,10 @@ def plot_certifications_by_manager(df):
 
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_certifications_by_year(df):
+def plot_certifications_by_year(year_counts):
     st.subheader("Certifications by Year 📅")
 
-    year_counts = df['Fiscal_Year'].value_counts().sort_index(ascending=False)
+    year_counts = year_counts.sort_index(ascending=False)
     fig, ax = plt.subplots()
     sns.lineplot(x=year_counts.index, y=year_counts.values, ax=ax, marker="o", color="b")
     ax.set_xlabel("Fiscal Year", fontsize=10)
@@ -130,10 +133,9 @@ def plot_certifications_by_year(df):
     ax.invert_xaxis()  # Reverse the x-axis
     st.pyplot(fig)  
 
-def plot_certifications_by_quarter(df):
+def plot_certifications_by_quarter(quarter_counts):
     st.subheader("Certifications by Quarter 📅")
 
-    quarter_counts = df['Quarter'].value_counts()
     fig, ax = plt.subplots()
     sns.barplot(x=quarter_counts.index, y=quarter_counts.values, ax=ax, palette="husl", hue=quarter_counts.index, legend=False)
     ax.set_xlabel("Quarter", fontsize=10)
@@ -145,14 +147,13 @@ def plot_certifications_by_quarter(df):
 
 # Dialog to handle adding a new certification
 @st.dialog("Add New Certification")
-def add_certification(df):
+def add_certification(options):
     st.session_state['dialog_open'] = True
     st.write("### Add New Certification")
 
-    # Function to filter and sort unique values, excluding None values
+    # Function to sort the distinct values provided by the server
     def filter_values(column_name):
-        unique_values = df[column_name].dropna().unique()  # Drop None values
-        return sorted(unique_values)
+        return sorted(options.get(column_name, []))
 
     # Input fields
     first_name = st.text_input("First Name")
@@ -228,14 +229,13 @@ def add_certification(df):
         st.rerun()
 
 @st.dialog("Update Selected Certification")
-def update_selected_certification(selected_certification, df):
+def update_selected_certification(selected_certification, options):
     st.session_state['dialog_open'] = True
     st.write("### Update Selected Certification")
 
-    # Function to filter and sort unique values, excluding None values
+    # Function to sort the distinct values provided by the server
     def filter_values(column_name):
-        unique_values = df[column_name].dropna().unique()  # Drop None values
-        return list(sorted(unique_values))  # Ensure the result is a list
+        return list(sorted(options.get(column_name, [])))  # Ensure the result is a list
 
     # Function to safely get the selected option
     def get_selected_option(options, value):
@@ -374,6 +374,80 @@ def move_column_to_front(df, column_name):
         df = df[cols]
     return df
 
+def editable_columns(df):
+    """Columns of a certifications page the admin grid lets you edit, e.g. Fiscal_Year for FISCAL_YEAR."""
+    return [column for column in df.columns if column.upper() in CERTIFICATION_EDITABLE_FIELDS]
+
+def grid_changes(df, edited_rows):
+    """
+    Turn the data editor's edited_rows ({row position: {column: value}}) into batch patch operations,
+    one per certification. Cells that were edited back to their original value are left out.
+    """
+    changes = {}
+    for position, cells in edited_rows.items():
+        row = df.iloc[int(position)]
+        fields = {
+            column.upper(): value
+            for column, value in cells.items()
+            if column.upper() in CERTIFICATION_EDITABLE_FIELDS and not (pd.isna(row[column]) and value is None) and value != row[column]
+        }
+        if fields:
+            changes.setdefault(int(row['employees_cert_id']), {}).update(fields)
+    return [{'op': 'patch', 'id': cert_id, 'fields': fields} for cert_id, fields in changes.items()]
+
+def apply_grid_changes(df, operations, results):
+    """Apply the patches the server accepted to the pinned page, so saving does not refetch it."""
+    columns = {column.upper(): column for column in df.columns}
+    for operation, result in zip(operations, results):
+        if result['status'] != 'ok':
+            continue
+        rows = df['employees_cert_id'] == operation['id']
+        for field, value in operation['fields'].items():
+            df.loc[rows, columns[field]] = value
+
+@st.fragment
+def certifications_grid(df_page, df_view):
+    """
+    Editable certifications grid for admins. Edits only rerun this fragment and are kept as a local
+    diff; "Save Changes" sends them all in one batch request and reruns the page once.
+    """
+    editor_key = f"certifications_editor_{st.session_state['certifications_grid']['generation']}"
+    st.data_editor(
+        df_view,
+        key=editor_key,
+        disabled=[column for column in df_view.columns if column not in editable_columns(df_view)],
+        hide_index=True,
+    )
+
+    operations = grid_changes(df_view, st.session_state[editor_key]['edited_rows'])
+    st.caption(f"{len(operations)} certification(s) with unsaved changes")
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        save = st.button("💾 Save Changes", disabled=not operations)
+    with col2:
+        discard = st.button("↩️ Discard Changes", disabled=not operations)
+
+    if discard:
+        st.session_state['certifications_grid']['generation'] += 1
+        st.rerun(scope="fragment")
+
+    if save:
+        with st.spinner("Saving changes..."):
+            response = apply_certification_batch(operations)
+        if response is None:
+            return
+
+        results = response['results']
+        apply_grid_changes(df_page, operations, results)
+        failed = [
+            f"Certification {result['id']}: {result.get('error', 'Not saved')}"
+            for result in results if result['status'] != 'ok'
+        ]
+        st.session_state['certifications_grid']['saved'] = (response['applied'], failed)
+        st.session_state['certifications_grid']['generation'] += 1
+        st.rerun()
+
 def certificates_page():
     st.title("🎓 Detailed Certificates")
 
@@ -541,34 +615,87 @@ def display_approval_dialog(selected_cert):
                 else:
                     st.error("No file uploaded. Please upload a certificate first.")
 
-# Assuming you have the request functions defined as above
+def refresh_pending_certifications():
+    """Append the submissions made since the newest one already listed, instead of downloading them all again."""
+    pending_certifications = st.session_state['pending_certifications']
+    after_id = max((cert['id'] for cert in pending_certifications), default=0)
+    new_certifications = fetch_pending_certifications(after_id)
+    if new_certifications is None:
+        st.error("Failed to fetch pending certifications.")
+        return
+    pending_certifications.extend(new_certifications)
+    st.success(f"{len(new_certifications)} new pending certification(s).")
+
+def review_selected_certifications(selected, decision):
+    """Approve or reject the selected submissions in one request and drop the reviewed ones from the list."""
+    employees_cert_ids = list(dict.fromkeys(cert['employees_cert_id'] for cert in selected))
+    with st.spinner(f"{'Approving' if decision == 'approve' else 'Rejecting'} {len(employees_cert_ids)} certification(s)..."):
+        response = review_certifications(employees_cert_ids, decision)
+    if response is None:
+        st.error("Failed to review the selected certifications.")
+        return
+
+    # Submissions that are no longer pending were reviewed elsewhere; they leave the list too
+    done = {result['id'] for result in response['results'] if result['status'] != 'not_found'}
+    st.session_state['pending_certifications'] = [
+        cert for cert in st.session_state['pending_certifications'] if int(cert['employees_cert_id']) not in done
+    ]
+    st.session_state['review_outcome'] = response
+
 def display_approvers_page():
     st.title("Certification Approval Dashboard")
 
     # Fetch pending certifications
-    if st.button("Fetch Pending Certifications"):
-        with st.spinner("Fetching pending certifications..."):
-            pending_certifications = fetch_pending_certifications()
-            if pending_certifications:
-                st.session_state['pending_certifications'] = pending_certifications
+    if 'pending_certifications' not in st.session_state:
+        if st.button("Fetch Pending Certifications"):
+            with st.spinner("Fetching pending certifications..."):
+                pending_certifications = fetch_pending_certifications()
+                # The server answers 404 when nothing is pending
+                st.session_state['pending_certifications'] = pending_certifications or []
                 st.success("Pending certifications fetched successfully.")
-            else:
-                st.error("Failed to fetch pending certifications.")
+    elif st.button("🔄 Check for New Submissions"):
+        with st.spinner("Fetching new submissions..."):
+            refresh_pending_certifications()
+
+    outcome = st.session_state.pop('review_outcome', None)
+    if outcome:
+        st.success(f"Reviewed {outcome['reviewed']} certification(s).")
+        for result in outcome['results']:
+            if 'error' in result:
+                st.error(f"Certification ID {result['id']}: {result['error']}")
 
     if 'pending_certifications' in st.session_state:
         pending_certifications = st.session_state['pending_certifications']
 
         # Display pending certifications
         if pending_certifications:
-            st.subheader("Pending Certifications")
-
-            for cert in pending_certifications:
+            st.subheader(f"Pending Certifications ({len(pending_certifications)})")
+
+            event = st.dataframe(
+                pd.DataFrame(pending_certifications, columns=['employees_cert_id', 'certification', 'EID', 'status']),
+                key="pending_certifications_table",
+                on_select="rerun",
+                selection_mode="multi-row",
+                hide_index=True,
+            )
+            selected = [pending_certifications[row] for row in event.selection.rows]
+
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button(f"✅ Approve Selected ({len(selected)})", disabled=not selected):
+                    review_selected_certifications(selected, 'approve')
+                    st.rerun()
+            with col2:
+                if st.button(f"❌ Reject Selected ({len(selected)})", disabled=not selected):
+                    review_selected_certifications(selected, 'reject')
+                    st.rerun()
+
+            # Uploaded certificates are only loaded for the selected submissions
+            for cert in selected:
                 with st.expander(f"Certification ID: {cert['employees_cert_id']}", expanded=False):
                     st.write(f"**Certification**: {cert['certification']}")
                     st.write(f"**Status**: {cert['status']}")
                     st.write(f"**EID**: {cert['EID']}")
-                    # st.write(f"**File Path**: {cert['file_path']}")
-                    # nicolen.e.aricayos-AWS Certified Cloud Practitioner-8_15_2024.png
 
                     # Display the image
                     image_path = cert['file_path']
@@ -576,20 +703,6 @@ def display_approvers_page():
                         st.image(f"uploads/{cert['EID']}-{cert['certification']}.png", caption="Uploaded Certificate", use_column_width=True)
                     else:
                         st.write("Image not available.")
-
-                    if st.button(f"Approve Certification ID: {cert['employees_cert_id']}", key=cert['employees_cert_id']):
-                        with st.spinner("Approving certification..."):
-                            result = approve_certification(cert['employees_cert_id'])
-                            if result:
-                                st.success("Certification approved successfully.")
-                                # Refresh pending certifications
-                                pending_certifications = fetch_pending_certifications()
-                                if pending_certifications:
-                                    st.session_state['pending_certifications'] = pending_certifications
-                                # time.sleep(2)
-                                # st.rerun()
-                            else:
-                                st.error("Failed to approve certification.")
         else:
             st.write("No pending certifications to display.")
     else:
@@ -624,14 +737,13 @@ def certification_page():
             upload feature provided. This page helps in managing and tracking the progress of employee certifications efficiently.
         """)
 
-        df = fetch_certifications()
+        options = fetch_certification_filter_options()
 
         st.sidebar.header("🎛️ **Filters**")
 
-        # Function to filter and sort unique values, excluding None values
+        # Function to sort the distinct values provided by the server
         def filter_values(column_name):
-            unique_values = df[column_name].dropna().unique()  # Drop None values
-            return sorted(unique_values)
+            return sorted(options.get(column_name, []))
 
         # Sidebar Filters
         e_id_filter = st.sidebar.text_input("🔍 **Search by EID, Employee ID, First Name, Last Name**", help="Search for employees by their EID, Employee ID, First Name, or Last Name.")
@@ -646,7 +758,7 @@ def certification_page():
         project_filter = st.sidebar.selectbox("📁 **Project Name**", ["All Project Names"] + filter_values("PROJECT_NAME"), help="Filter by the project associated with the certification.")
         manager_eid_filter = st.sidebar.selectbox("👤 **Manager EID**", ["All Manager EIDs"] + filter_values("MANAGER_EID"), help="Filter by the manager's EID.")
 
-        if "Certification_Level" in df.columns:
+        if "Certification_Level" in options:
             level_filter = st.sidebar.selectbox("📜 **Certification Level**", ["All Certification Levels"] + filter_values("Certification_Level"), help="Filter by the level of certification.")
         else:
             level_filter = "All Certification Levels"
@@ -660,50 +772,49 @@ def certification_page():
             "EMPLOYEE_STATUS", "CAPABILITY", "MANAGEMENT_LEVEL", 
             "Fiscal_Year", "Quarter", "Month", "PROJECT_NAME", "MANAGER_EID", "Certification_Level", "CURRENT_PROGRESS"], help="Group the data by the selected column.")
 
-        df_filtered = df.copy()
+        page_size = st.sidebar.selectbox("📄 **Rows per Page**", [25, 50, 100, 200], index=1, help="Number of certifications fetched per page.")
+
+        # Filters are applied by the server, "All ..." selections are left out
+        filters = {
+            'search': e_id_filter,
+            'certification': certification_filter if certification_filter != "All Certifications" else None,
+            'status': employee_status_filter if employee_status_filter != "All Employee Statuses" else None,
+            'progress': current_progress_filter if current_progress_filter != "All Progress" else None,
+            'management_level': management_level_filter if management_level_filter != "All Management Levels" else None,
+            'capability': capability_filter if capability_filter != "All Capabilities" else None,
+            'fiscal_year': fiscal_year_filter if fiscal_year_filter != "All Fiscal Years" else None,
+            'quarter': quarter_filter if quarter_filter != "All Quarters" else None,
+            'month': month_filter if month_filter != "All Months" else None,
+            'project': project_filter if project_filter != "All Project Names" else None,
+            'manager': manager_eid_filter if manager_eid_filter != "All Manager EIDs" else None,
+            'level': level_filter if level_filter != "All Certification Levels" else None,
+        }
+        filters = {key: value for key, value in filters.items() if value}
 
-        if e_id_filter:
-            combined_columns = df_filtered["EID"].astype(str) + " " + \
-                            df_filtered["EMPLOYEE_ID"].astype(str) + " " + \
-                            df_filtered["FIRST_NAME"].astype(str) + " " + \
-                            df_filtered["LAST_NAME"].astype(str)
-            df_filtered = df_filtered[combined_columns.str.contains(e_id_filter, case=False, na=False)]
-
-        if certification_filter != "All Certifications":
-            df_filtered = df_filtered[df_filtered["TARGET_CERTIFICATION"] == certification_filter]
-            df_filtered = move_column_to_front(df_filtered, "TARGET_CERTIFICATION")
-        if employee_status_filter != "All Employee Statuses":
-            df_filtered = df_filtered[df_filtered["EMPLOYEE_STATUS"] == employee_status_filter]
-            df_filtered = move_column_to_front(df_filtered, "EMPLOYEE_STATUS")
-        if current_progress_filter != "All Progress":
-            df_filtered = df_filtered[df_filtered["CURRENT_PROGRESS"] == current_progress_filter]
-            df_filtered = move_column_to_front(df_filtered, "CURRENT_PROGRESS")
-        if management_level_filter != "All Management Levels":
-            df_filtered = df_filtered[df_filtered["MANAGEMENT_LEVEL"] == management_level_filter]
-            df_filtered = move_column_to_front(df_filtered, "MANAGEMENT_LEVEL")
-        if capability_filter != "All Capabilities":
-            df_filtered = df_filtered[df_filtered["CAPABILITY"] == capability_filter]
-            df_filtered = move_column_to_front(df_filtered, "CAPABILITY")
-        if fiscal_year_filter != "All Fiscal Years":
-            df_filtered = df_filtered[df_filtered["Fiscal_Year"] == fiscal_year_filter]
-            df_filtered = move_column_to_front(df_filtered, "Fiscal_Year")
-        if quarter_filter != "All Quarters":
-            df_filtered = df_filtered[df_filtered["Quarter"] == quarter_filter]
-            df_filtered = move_column_to_front(df_filtered, "Quarter")
-        if month_filter != "All Months":
-            df_filtered = df_filtered[df_filtered["Month"] == month_filter]
-            df_filtered = move_column_to_front(df_filtered, "Month")
-        if project_filter != "All Project Names":
-            df_filtered = df_filtered[df_filtered["PROJECT_NAME"] == project_filter]
-            df_filtered = move_column_to_front(df_filtered, "PROJECT_NAME")
-        if manager_eid_filter != "All Manager EIDs":
-            df_filtered = df_filtered[df_filtered["MANAGER_EID"] == manager_eid_filter]
-            df_filtered = move_column_to_front(df_filtered, "MANAGER_EID")
-
-        if level_filter != "All Certification Levels":
-            df_filtered = df_filtered[df_filtered["Certification_Level"] == level_filter]
-            df_filtered = move_column_to_front(df_filtered, "Certification_Level")
+        # Start again from the first page whenever the filters or the page size change
+        if st.session_state.get('certifications_query') != (filters, page_size):
+            st.session_state['certifications_query'] = (filters, page_size)
+            st.session_state['certifications_cursors'] = [None]
+
+        cursors = st.session_state['certifications_cursors']
+        edit_mode = st.session_state.get('persona') == ADMIN and st.toggle("✏️ Edit in Grid", help="Edit cells in place and save every change in one request.")
+
+        # While editing, the page is pinned in the session: cell edits and saves do not refetch it
+        grid = st.session_state.setdefault('certifications_grid', {'query': None, 'page': None, 'generation': 0})
+        query = (filters, page_size, cursors[-1])
+        if edit_mode and grid['query'] == query:
+            df_page, next_cursor, total = grid['page']
+        else:
+            df_page, next_cursor, total = fetch_certifications_page(filters, after=cursors[-1], limit=page_size)
+            grid.update(query=query, page=(df_page, next_cursor, total))
+            grid['generation'] += 1
+        df_filtered = df_page.copy()
 
+        for key in filters:
+            if key in CERTIFICATION_FILTER_COLUMNS:
+                df_filtered = move_column_to_front(df_filtered, CERTIFICATION_FILTER_COLUMNS[key])
+
+        # Sorting and grouping only reorder the rows of the current page
         if sort_by == "Ascending":
             df_filtered["Certification_Level"] = sort_by_ranking(df_filtered["Certification_Level"])
             df_filtered = df_filtered.sort_values(by="Certification_Level", ascending=True)
@@ -711,35 +822,59 @@ def certification_page():
             df_filtered["Certification_Level"] = sort_by_ranking(df_filtered["Certification_Level"])
             df_filtered = df_filtered.sort_values(by="Certification_Level", ascending=False)
 
-        if group_by_filter != "No Grouping":
+        if group_by_filter != "No Grouping" and not df_filtered.empty:
             df_filtered = df_filtered.groupby(group_by_filter).apply(lambda x: x).reset_index(drop=True)
         
-        # Displaying DataFrame with selection capabilities
-        event = st.dataframe(
-            df_filtered,
-            key="data",
-            on_select="rerun",
-            selection_mode="multi-row"
-        )
-        
+        saved = grid.pop('saved', None)
+        if saved:
+            applied, failed = saved
+            st.success(f"Saved {applied} change(s).")
+            for failure in failed:
+                st.error(failure)
+
+        if edit_mode:
+            certifications_grid(df_page, df_filtered)
+        else:
+            # Displaying DataFrame with selection capabilities
+            event = st.dataframe(
+                df_filtered,
+                key="data",
+                on_select="rerun",
+                selection_mode="multi-row"
+            )
+
+        first_row = (len(cursors) - 1) * page_size
+        st.caption(f"Showing {first_row + 1 if total else 0}–{first_row + len(df_filtered)} of {total} certifications")
+
+        col1, col2 = st.columns([1, 1])
+
+        with col1:
+            if st.button("◀ Previous Page", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next Page ▶", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
         col1, col2, col3 = st.columns([1, 1, 1])
     
         with col1:
             if st.session_state.get('persona') == ADMIN and st.button("Add New Certification"):
-                add_certification(df)
+                add_certification(options)
 
         with col2:
-            if st.session_state.get('persona') == ADMIN and st.button("Update Selected Certification"):
+            if st.session_state.get('persona') == ADMIN and not edit_mode and st.button("Update Selected Certification"):
                 if len(event.selection.rows) == 1:
 
-                    update_selected_certification(df_filtered.iloc[event.selection.rows[0]], df)
+                    update_selected_certification(df_filtered.iloc[event.selection.rows[0]], options)
                 elif len(event.selection.rows) < 1:
                     show_custom_toast("Please select a certification to update.")
                 else:
                     show_custom_toast("Please select only one certification to update.")
 
         with col3:
-            if st.session_state.get('persona') == ADMIN and st.button("Delete Selected Certification"):
+            if st.session_state.get('persona') == ADMIN and not edit_mode and st.button("Delete Selected Certification"):
                 if len(event.selection.rows) == 1:
                     delete_selected_certification(df_filtered.iloc[event.selection.rows[0]]['employees_cert_id'])
                 elif len(event.selection.rows) < 1:
@@ -758,31 +893,26 @@ def certification_page():
                 st.session_state['page'] = 'check_certificates'
                 st.rerun()
 
-        # Add download button to export filtered data
-        generate_csv_download_link(df_filtered, "filtered_certification_data")
+        # Add download button to export filtered data, covering every matching row and not just the current page
+        generate_csv_download_link(filters, "filtered_certification_data")
 
         st.write('---')
         
-        # Add visualizations
-        plot_certifications_by_level(df_filtered)
-        plot_progress_distribution(df_filtered)
-        plot_certifications_by_project(df_filtered)
-        plot_certifications_by_manager(df_filtered)
-        plot_certifications_by_year(df_filtered)
-        plot_certifications_by_quarter(df_filtered)
+        # Add visualizations, counted by the server over every matching row
+        counts = fetch_certification_counts(["level", "progress", "project", "manager", "fiscal_year", "quarter"], filters)
+        plot_certifications_by_level(counts["level"])
+        plot_progress_distribution(counts["progress"])
+        plot_certifications_by_project(counts["project"])
+        plot_certifications_by_manager(counts["manager"])
+        plot_certifications_by_year(counts["fiscal_year"])
+        plot_certifications_by_quarter(counts["quarter"])
 
     else:
         st.title("📜 My Certifications")
 
-        # Fetch certifications data
-        df = fetch_certifications()
-
-        # Filter the DataFrame based on the EID from the session state
+        # Fetch only the certifications of the EID from the session state
         e_id = st.session_state.get('EID', '')
-        if e_id:
-            df_filtered = df[df['EID'] == e_id]
-        else:
-            df_filtered = df
+        df_filtered, _, _ = fetch_certifications_page({'eid': e_id} if e_id else {}, limit=500)
 
         # Displaying DataFrame with selection capabilities
         event = st.dataframe(
@@ -3,30 +3,22 @@ import time
 import re
 
 from streamlit_calendar import calendar
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from services.events_service import fetch_events
-from datetime import datetime
 
 from constants.theme import PRIM_COLOR, BG_COLOR, TEXT_COLOR
 from services.events_service import create_event, update_event, delete_event
 from constants.persona import ADMIN
 
-def format_event_date(date_str, time_str):
-    # Combine date and time into a single datetime object
-    try:
-        return datetime.strptime(f"{date_str} {time_str}", "%m/%d/%Y %I:%M%p").strftime("%Y-%m-%d")
-    except ValueError:
-        return ''
-
 def format_events(events_data):
     events = []
     for event in events_data:
         # Combine the title with the start and end times
         title = f"{event.get('event_name', 'No Title')} {event.get('start_time', '')} - {event.get('end_time', '')}"
         
-        # Format the start and end dates
-        start_date = format_event_date(event.get('start_date', ''), event.get('start_time', ''))
-        end_date = format_event_date(event.get('end_date', ''), event.get('end_time', ''))
+        # The server sends normalized ISO timestamps, the calendar shows the date part
+        start_date = (event.get('start_at') or '')[:10]
+        end_date = (event.get('end_at') or '')[:10]
         
         # Create the formatted event
         formatted_event = {
@@ -40,6 +32,27 @@ def format_events(events_data):
         events.append(formatted_event)
     return events
 
+def visible_window(anchor, calendar_mode):
+    """First and last (exclusive) day the calendar shows around `anchor`, laid out like FullCalendar (weeks start on Sunday)."""
+    if calendar_mode == "dayGridMonth":
+        first_day = anchor.replace(day=1)
+        start = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
+        return start, start + timedelta(weeks=6)
+    if calendar_mode == "timeGridDay":
+        return anchor, anchor + timedelta(days=1)
+    start = anchor - timedelta(days=(anchor.weekday() + 1) % 7)
+    return start, start + timedelta(weeks=1)
+
+def shift_calendar(calendar_mode, direction):
+    """Move the calendar one month, week or day back (-1) or forward (1)."""
+    anchor = st.session_state['calendar_date']
+    if calendar_mode == "dayGridMonth":
+        month = anchor.month - 1 + direction
+        anchor = date(anchor.year + month // 12, month % 12 + 1, 1)
+    else:
+        anchor += timedelta(days=direction * (1 if calendar_mode == "timeGridDay" else 7))
+    st.session_state['calendar_date'] = anchor
+
 # Function to display event details
 def display_event_details(event):
     # Extract event details
@@ -281,25 +294,18 @@ def dashboard_page():
         view_options
     )
 
-    # Fetch events from the server
-    events_data = fetch_events()
-
-    # Transform events data into the format required by the calendar
-    if events_data:
-        events = []
-        for event in events_data:
-            formatted_event = {
-                "title": event.get('event_name', 'No Title'),
-                "color": event.get('color', '#FFFFFF'),
-                "start": f"{event.get('start_date', '')} {event.get('start_time', '')}",
-                "end": f"{event.get('end_date', '')} {event.get('end_time', '')}",
-                "description": event.get('description', 'No Description'),
-                "event_id": event.get('event_id', '')
-            }
-            events.append(formatted_event)
-    else:
-        st.error("No events available.")
-        events = []
+    # The calendar is navigated from here, so only the events in view are fetched and formatted
+    if 'calendar_date' not in st.session_state:
+        st.session_state['calendar_date'] = date.today()
+    col1, col2 = st.sidebar.columns([1, 1])
+    with col1:
+        st.button("◀ Previous", on_click=shift_calendar, args=(calendar_mode, -1))
+    with col2:
+        st.button("Next ▶", on_click=shift_calendar, args=(calendar_mode, 1))
+    anchor = st.sidebar.date_input("📅 Go to Date", key='calendar_date')
+
+    window_start, window_end = visible_window(anchor, calendar_mode)
+    events_data = fetch_events(window_start, window_end)
 
     formatted_events = format_events(events_data)
 
@@ -317,13 +323,14 @@ def dashboard_page():
         "editable": "true",
         "selectable": "true",
         "headerToolbar": {
-            "left": "today prev,next",
+            "left": "",
             "center": "title",
             "right": "resourceTimelineDay,resourceTimelineWeek,resourceTimelineMonth",
         },
         "slotMinTime": "06:00:00",
         "slotMaxTime": "18:00:00",
         "initialView": calendar_mode,
+        "initialDate": anchor.isoformat(),
         "resources": st.session_state.events
     }
 
@@ -357,7 +364,8 @@ def dashboard_page():
 
     st.markdown("**Hint:** Adjust the widen view option based on your preference—turn it off to see the full calendar, or leave it on for a wider view for other calendar mode.")
     # Display the calendar
-    calendar_widget = calendar(events=st.session_state.events, options=calendar_options, custom_css=custom_css)
+    # A new key per window remounts the calendar on the new initialDate
+    calendar_widget = calendar(events=st.session_state.events, options=calendar_options, custom_css=custom_css, key=f"calendar_{calendar_mode}_{window_start}")
     
     # Check if the eventClick callback is present
     if calendar_widget.get("callback") == "eventClick":
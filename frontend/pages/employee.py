@@ -122,7 +122,10 @@ def display_summary_report(df_filtered):
         st.warning("⚠️ No data available to display summary report.")
 
 def generate_csv_download_link(df, filename_prefix):
-    """Generate a download link for a CSV file with the current date and time."""
+    """Build the CSV only when requested, then offer it with the current date and time."""
+    if not st.button("📥 Export CSV"):
+        return
+
     current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     filename = f"{filename_prefix}_{current_time}.csv"
     csv_buffer = BytesIO()
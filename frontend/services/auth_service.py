@@ -1,5 +1,7 @@
 import requests
 import os
+import jwt
+import streamlit as st
 
 from dotenv import load_dotenv
 from constants.api_routes import AUTH_AR
@@ -8,6 +10,7 @@ load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 API_URL = os.getenv("API_URL")
+JWT_ALGORITHM = 'HS256'
 
 def authenticate_user(username, password):
     data = {"username": username, "password": password}
@@ -18,3 +21,31 @@ def authenticate_user(username, password):
         return response.json(), True
     else:
         return response.json(), False
+
+def validate_token(token):
+    """
+    Check the login token locally, without a request: signature and expiry.
+    Returns its claims, or None when it is invalid or expired.
+    Revocation is not checked here: logout drops the token from this session, and the API refuses
+    a revoked token on every call it is sent with.
+    """
+    if not SECRET_KEY:
+        # Without the key shared with the API no token can be trusted
+        print("SECRET_KEY is not set; login tokens cannot be validated")
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+
+def auth_headers():
+    """Authorization header carrying the current user's login token, for endpoints that require it."""
+    token = st.session_state.get('token')
+    return {'Authorization': f'Bearer {token}'} if token else {}
+
+def logout_user():
+    """Revoke the current login token on the server."""
+    try:
+        requests.post(f"{API_URL}/{AUTH_AR}/logout", headers=auth_headers())
+    except requests.RequestException as e:
+        print("Error:", e)
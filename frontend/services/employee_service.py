@@ -2,14 +2,32 @@ import streamlit as st
 import requests
 import pandas as pd
 import json
+import tempfile
+import pyarrow as pa
 
 from constants.config import API_URL
 from constants.api_routes import EMPLOYEES_AR
+from services.http_cache import conditional_get
+from services.auth_service import auth_headers
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Prefer Arrow IPC for the tabular endpoints, JSON remains the fallback
+TABLE_HEADERS = {'Accept': f'{ARROW_STREAM_MIMETYPE}, application/json;q=0.9'}
+
+def is_arrow_response(response):
+    return response.headers.get('Content-Type', '').startswith(ARROW_STREAM_MIMETYPE)
+
+def read_arrow_response(response):
+    """Decode an Arrow IPC stream response straight into a DataFrame."""
+    return pa.ipc.open_stream(response.content).read_all().to_pandas()
 
 def fetch_employees():
     """Fetch data from the API and return it as a DataFrame."""
-    response = requests.get(f"{API_URL}/{EMPLOYEES_AR}")
-    if response.status_code == 200:
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}", headers=TABLE_HEADERS)
+    if response.status_code == 200 and is_arrow_response(response):
+        df = read_arrow_response(response)
+    elif response.status_code == 200:
         data = response.json().get("employees", [])
         df = pd.DataFrame(data)
     else:
@@ -19,17 +37,87 @@ def fetch_employees():
 
 def fetch_certifications():
     """Fetch certification data from the API."""
-    response = requests.get(f"{API_URL}/{EMPLOYEES_AR}/get_certifications")
-    if response.status_code == 200:
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}/get_certifications", headers=TABLE_HEADERS)
+    if response.status_code == 200 and is_arrow_response(response):
+        return read_arrow_response(response)
+    elif response.status_code == 200:
         return pd.read_json(response.text)
     else:
         st.error("Failed to fetch certification data.")
         return pd.DataFrame()
-    
+
+def fetch_certifications_page(filters=None, after=None, limit=50):
+    """Fetch one server-filtered page of certifications. Returns (DataFrame, next_cursor, total)."""
+    params = dict(filters or {})
+    params['limit'] = limit
+    if after:
+        params['after'] = after
+
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}/certifications/page", params=params)
+    if response.status_code == 200:
+        data = response.json()
+        return pd.DataFrame(data.get('certifications', [])), data.get('next_cursor'), data.get('total', 0)
+    else:
+        st.error("Failed to fetch certification data.")
+        return pd.DataFrame(), None, 0
+
+def fetch_certification_counts(dimensions, filters=None):
+    """Fetch server-side grouped counts for each dimension. Returns {dimension: pd.Series of counts indexed by value}."""
+    params = dict(filters or {})
+    params['dimension'] = list(dimensions)
+
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}/certifications/aggregate", params=params)
+    if response.status_code == 200:
+        counts = response.json().get('counts', {})
+        return {
+            dimension: pd.Series(
+                [item['count'] for item in counts.get(dimension, [])],
+                index=[item['value'] for item in counts.get(dimension, [])],
+                name='count',
+                dtype='int64',
+            )
+            for dimension in dimensions
+        }
+    else:
+        st.error("Failed to fetch certification counts.")
+        return {dimension: pd.Series(name='count', dtype='int64') for dimension in dimensions}
+
+def export_certifications(filters=None, export_format='csv'):
+    """Stream the filtered certifications export from the API into a temporary file. Returns the file, or None on failure."""
+    params = dict(filters or {})
+    params['format'] = export_format
+
+    try:
+        with requests.get(f"{API_URL}/{EMPLOYEES_AR}/certifications/export", params=params, stream=True) as response:
+            if response.status_code != 200:
+                st.error("Failed to export certification data.")
+                return None
+
+            # Spool to disk chunk by chunk instead of holding the whole export in memory
+            export_file = tempfile.TemporaryFile()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                export_file.write(chunk)
+            export_file.seek(0)
+            return export_file
+    except requests.exceptions.RequestException as e:
+        st.error(f"An error occurred while connecting to the server: {str(e)}")
+        return None
+
+def fetch_certification_filter_options():
+    """Fetch the distinct values available for each certification filter, keyed by column name."""
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}/certifications/filter_options")
+    if response.status_code == 200:
+        return response.json().get('options', {})
+    else:
+        st.error("Failed to fetch certification filter options.")
+        return {}
+
 def fetch_certificates():
     """Fetch certification data from the API."""
-    response = requests.get(f"{API_URL}/{EMPLOYEES_AR}/certificates")
-    if response.status_code == 200:
+    response = conditional_get(f"{API_URL}/{EMPLOYEES_AR}/certificates", headers=TABLE_HEADERS)
+    if response.status_code == 200 and is_arrow_response(response):
+        return read_arrow_response(response)
+    elif response.status_code == 200:
         data = response.json()  # Convert response to JSON
         certificates = pd.DataFrame(data['certificates'])  # Convert JSON data to DataFrame
         return certificates
@@ -76,6 +164,25 @@ def update_certification(employees_cert_id, data):
     except requests.exceptions.RequestException as e:
         st.error(f"An error occurred while connecting to the server: {str(e)}")
 
+def apply_certification_batch(operations, atomic=False):
+    """
+    Send many certification inserts, patches and deletes in one request, e.g.
+    [{"op": "patch", "id": 12, "fields": {"CURRENT_PROGRESS": "Passed"}}, {"op": "delete", "id": 13}].
+    Returns the per-item results, or None if the request failed.
+    """
+    try:
+        response = requests.post(
+            f"{API_URL}/{EMPLOYEES_AR}/certifications/batch",
+            json={'operations': operations, 'atomic': atomic},
+            headers=auth_headers(),
+        )
+        if response.status_code in (200, 409):
+            return response.json()
+        st.error(f"Failed to save changes: {response.json().get('error', 'Unknown error')}")
+    except requests.exceptions.RequestException as e:
+        st.error(f"An error occurred while connecting to the server: {str(e)}")
+    return None
+
 def delete_certification(cert_id):
     try:
         # Send DELETE request to the API endpoint
@@ -101,9 +208,10 @@ def send_certification_data(employees_cert_id, file_path, certification, status,
     else:
         st.error(f"Failed to submit certification: {response.json().get('error', 'Unknown error')}")
 
-def fetch_pending_certifications():
+def fetch_pending_certifications(after_id=None):
+    """Fetch the pending certification submissions, only those newer than `after_id` when it is given."""
     try:
-        response = requests.get(f"{API_URL}/get-pending-certifications")
+        response = conditional_get(f"{API_URL}/get-pending-certifications", params={'after_id': after_id} if after_id is not None else None)
         response.raise_for_status()  # Raise HTTPError for bad responses
         return response.json()
     except requests.RequestException as e:
@@ -114,9 +222,25 @@ def approve_certification(employees_cert_id):
     try:
         response = requests.post(f"{API_URL}/approve-certification", json={
             'employees_cert_id': employees_cert_id
-        })
+        }, headers=auth_headers())
         response.raise_for_status()  # Raise HTTPError for bad responses
         return response.json()
     except requests.RequestException as e:
         print(f"Error approving certification: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def review_certifications(employees_cert_ids, decision):
+    """
+    Approve or reject the pending submissions of many certifications in one request; decision is
+    "approve" or "reject". Returns the per-certification results, or None if the request failed.
+    """
+    try:
+        response = requests.post(f"{API_URL}/review-certifications", json={
+            'employees_cert_ids': [int(cert_id) for cert_id in employees_cert_ids],
+            'decision': decision,
+        }, headers=auth_headers())
+        response.raise_for_status()  # Raise HTTPError for bad responses
+        return response.json()
+    except requests.RequestException as e:
+        print(f"Error reviewing certifications: {e}")
+        return None
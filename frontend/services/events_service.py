@@ -3,10 +3,15 @@ import streamlit as st
 
 from constants.config import API_URL
 from constants.api_routes import EVENTS_AR
+from services.http_cache import conditional_get
 
-def fetch_events():
-    """Fetch event data from the API and return it as JSON."""
-    response = requests.get(f"{API_URL}/{EVENTS_AR}")
+def fetch_events(start=None, end=None):
+    """
+    Fetch event data from the API and return it as JSON. With start and end (dates, end exclusive)
+    only the events overlapping that window are returned.
+    """
+    params = {name: value.isoformat() for name, value in (('start', start), ('end', end)) if value is not None}
+    response = conditional_get(f"{API_URL}/{EVENTS_AR}", params=params)
     if response.status_code == 200:
         # Directly return the JSON data
         data = response.json()
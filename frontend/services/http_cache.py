@@ -0,0 +1,37 @@
+import threading
+import requests
+from cachetools import LRUCache
+
+# Last 200 response per (url, params, Accept), replayed when the server answers 304.
+# Shared by every Streamlit session in this process; the ETag makes that safe.
+_responses = LRUCache(maxsize=64)
+_responses_lock = threading.Lock()
+
+def _cache_key(url, params, headers):
+    items = []
+    for name, value in sorted((params or {}).items()):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        items.append((name, tuple(str(v) for v in values)))
+    return url, tuple(items), (headers or {}).get('Accept', '')
+
+def conditional_get(url, params=None, headers=None, **kwargs):
+    """
+    GET `url`, revalidating the last response with If-None-Match.
+    A 304 returns the previously received response, so callers handle it exactly like a 200.
+    """
+    key = _cache_key(url, params, headers)
+    with _responses_lock:
+        cached = _responses.get(key)
+
+    request_headers = dict(headers or {})
+    if cached is not None:
+        request_headers['If-None-Match'] = cached.headers['ETag']
+
+    response = requests.get(url, params=params, headers=request_headers, **kwargs)
+    if response.status_code == 304 and cached is not None:
+        return cached
+
+    if response.status_code == 200 and 'ETag' in response.headers:
+        with _responses_lock:
+            _responses[key] = response
+    return response
@@ -3,15 +3,27 @@ import streamlit as st
 
 from constants.config import API_URL
 from constants.api_routes import INGEST_AR
+from services.auth_service import auth_headers
 
-def upload_csv(file, table_name, operation):
+def upload_csv(file, table_name, operation, key_columns=None):
     files = {'file': file}
     data = {'table_name': table_name, 'operation': operation}
+    if key_columns:
+        data['key_columns'] = ','.join(key_columns)
 
-    response = requests.post(f"{API_URL}/{INGEST_AR}/upload_csv", files=files, data=data)
+    response = requests.post(f"{API_URL}/{INGEST_AR}/upload_csv", files=files, data=data, headers=auth_headers())
     
     if response.status_code == 200:
         st.success(response.json()['message'])
     else:
         st.error("Failed to upload")
         st.error(response.json().get('error', 'Failed to upload CSV.'))
+
+
+def rollback_table(table_name):
+    response = requests.post(f"{API_URL}/{INGEST_AR}/rollback", json={'table_name': table_name}, headers=auth_headers())
+
+    if response.status_code == 200:
+        st.success(response.json()['message'])
+    else:
+        st.error(response.json().get('error', 'Failed to roll back table.'))
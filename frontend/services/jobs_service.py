@@ -0,0 +1,49 @@
+import requests
+import streamlit as st
+
+from constants.config import API_URL
+from constants.api_routes import JOBS_AR
+from services.auth_service import auth_headers
+
+def submit_job(kind, params=None):
+    """Queue a background job. Returns the job, or None on failure."""
+    response = requests.post(f"{API_URL}/{JOBS_AR}", json={'kind': kind, 'params': params or {}}, headers=auth_headers())
+    if response.status_code == 202:
+        return response.json()['job']
+    st.error(response.json().get('error', 'Failed to start the job.'))
+    return None
+
+def submit_ingest_job(file, table_name, operation, key_columns=None):
+    """Upload a CSV and load it in the background. Returns the job, or None on failure."""
+    files = {'file': file}
+    data = {'table_name': table_name, 'operation': operation}
+    if key_columns:
+        data['key_columns'] = ','.join(key_columns)
+
+    response = requests.post(f"{API_URL}/{JOBS_AR}/ingest", files=files, data=data, headers=auth_headers())
+    if response.status_code == 202:
+        return response.json()['job']
+    st.error(response.json().get('error', 'Failed to start the upload.'))
+    return None
+
+def fetch_jobs(limit=50):
+    response = requests.get(f"{API_URL}/{JOBS_AR}", params={'limit': limit}, headers=auth_headers())
+    if response.status_code == 200:
+        return response.json().get('jobs', [])
+    st.error("Failed to fetch jobs.")
+    return []
+
+def cancel_job(job_id):
+    response = requests.post(f"{API_URL}/{JOBS_AR}/{job_id}/cancel", headers=auth_headers())
+    if response.status_code == 200:
+        return response.json()['job']
+    st.error(response.json().get('error', 'Failed to cancel the job.'))
+    return None
+
+def fetch_job_result(job_id):
+    """Download a finished export job's file. Returns its bytes, or None."""
+    response = requests.get(f"{API_URL}/{JOBS_AR}/{job_id}/result", headers=auth_headers())
+    if response.status_code == 200:
+        return response.content
+    st.error(response.json().get('error', 'Failed to download the job result.'))
+    return None
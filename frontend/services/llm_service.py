@@ -21,6 +21,10 @@ def ask_llm(question):
     if response.status_code == 200:
         st.markdown(f"### CertiGuide Response:")
         st.success(response.json().get('answer', 'No answer provided'))
+    elif response.status_code == 503:
+        st.warning("CertiGuide is busy answering other questions, please try again in a few seconds.")
+    elif response.status_code == 504:
+        st.warning("CertiGuide took too long to answer, please try again.")
     else:
         st.error(f"Error fetching data: {response.status_code}")
 
@@ -7,13 +7,14 @@ load_dotenv()
 
 API_URL = os.getenv("API_URL")
 
-# Function to create or update a session
-def create_or_update_session(role, eid):
+# Function to create or update a session; an existing session_id is extended instead of replaced
+def create_or_update_session(role, eid, session_id=None):
     try:
         url = f"{API_URL}/{SESSION_AR}/create_or_update"
         data = {
             "role": role,
-            "eid": eid
+            "eid": eid,
+            "session_id": session_id
         }
         response = requests.post(url, json=data)
 
@@ -27,10 +28,10 @@ def create_or_update_session(role, eid):
         return {'error': str(e)}, False
 
 # Function to fetch the current session
-def fetch_session():
+def fetch_session(session_id):
     try:
         url = f"{API_URL}/{SESSION_AR}/fetch"
-        response = requests.get(url)
+        response = requests.get(url, headers={"X-Session-ID": session_id})
 
         if response.status_code == 200:
             session_data = response.json()
@@ -43,10 +44,10 @@ def fetch_session():
         return {'error': str(e)}, False
 
 # Function to delete the current session
-def delete_session():
+def delete_session(session_id):
     try:
         url = f"{API_URL}/{SESSION_AR}/delete"
-        response = requests.delete(url)
+        response = requests.delete(url, headers={"X-Session-ID": session_id})
 
         if response.status_code == 200:
             return response.json(), True